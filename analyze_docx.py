@@ -1,100 +1,301 @@
 #!/usr/bin/env python3
 """Analyze DOCX file to understand structure and special tags"""
 
+import re
 import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 try:
-    from docx import Document
     from docx.shared import RGBColor
-    import re
+    from docx.styles import BabelFish
 except ImportError:
     print("Installing required packages...")
     import subprocess
     subprocess.check_call([sys.executable, "-m", "pip", "install", "python-docx"])
-    from docx import Document
     from docx.shared import RGBColor
-    import re
+    from docx.styles import BabelFish
+
+# lxml is always present alongside python-docx
+from lxml import etree
+
+# Paragraphs are joined with this separator and scanned as one buffer. XML 1.0
+# cannot carry \x1e, so it never occurs in document text.
+_PARAGRAPH_SEP = '\x1e'
+
+# Special patterns (If conditions, tags, etc.), each with the literal all of
+# its matches start with. The patterns overlap (a tag inside {{...}} is also a
+# variable), so each is counted by its own scan of the whole document, run
+# only when its literal occurs at all.
+# No pattern can match across _PARAGRAPH_SEP (note that \s matches \x1e).
+_SPECIAL_PATTERNS = (
+    ('if_conditions', '{{', r'(?i:\{\{#if[^\S\x1e]+[^\n\x1e]*?\}\}|\{\{/if\}\})'),
+    ('variables', '{{', r'\{\{[^#/\x1e][^\n\x1e]*?\}\}'),
+    ('loops', '{{', r'(?i:\{\{#each[^\S\x1e]+[^\n\x1e]*?\}\}|\{\{/each\}\})'),
+    ('tags', '<', r'<[^>\x1e]+>'),
+    ('merge_fields', '[[', r'\[\[[^\n\x1e]*?\]\]'),
+)
+_SPECIAL_SCANS = tuple((literal, re.compile(src)) for _, literal, src in _SPECIAL_PATTERNS)
+# A paragraph holds a match of some special pattern exactly when this
+# alternation finds one in it; used to pick sample paragraphs
+_SPECIAL_PATTERN = re.compile('|'.join(src for _, _, src in _SPECIAL_PATTERNS))
+# Every special pattern starts with one of these characters; most template
+# paragraphs contain none of them and never reach the full pattern
+_SPECIAL_TRIGGER = re.compile(r'[{<\[]')
+
+# WordprocessingML tags used when streaming word/document.xml
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = f'{_W}body'
+_W_P = f'{_W}p'
+_W_TBL = f'{_W}tbl'
+_W_T = f'{_W}t'
+_W_BR = f'{_W}br'
+_W_TYPE = f'{_W}type'
+_W_VAL = f'{_W}val'
+_W_STYLE = f'{_W}style'
+_W_STYLE_ID = f'{_W}styleId'
+_W_DEFAULT = f'{_W}default'
+_RUN_CHARS = {f'{_W}tab': '\t', f'{_W}ptab': '\t', f'{_W}cr': '\n', f'{_W}noBreakHyphen': '-'}
+_NAMESPACES = {'w': _W[1:-1]}
+_RUN_CONTENT = etree.XPath('w:r/*|w:hyperlink/w:r/*', namespaces=_NAMESPACES)
+_STYLE_ID = etree.XPath('string(w:pPr/w:pStyle/@w:val)', namespaces=_NAMESPACES)
+_RUN_FONTS = etree.XPath('w:r/w:rPr/w:rFonts/@w:ascii', namespaces=_NAMESPACES)
+_STYLE_NAME = etree.XPath('w:name/@w:val', namespaces=_NAMESPACES)
+_TABLE_ROWS = etree.XPath('w:tr', namespaces=_NAMESPACES)
+_GRID_COLUMNS = etree.XPath('w:tblGrid/w:gridCol', namespaces=_NAMESPACES)
+_TABLE_CELLS = etree.XPath('w:tr/w:tc', namespaces=_NAMESPACES)
+_GRID_SPAN = etree.XPath('string(w:tcPr/w:gridSpan/@w:val)', namespaces=_NAMESPACES)
+_V_MERGE = etree.XPath('w:tcPr/w:vMerge', namespaces=_NAMESPACES)
+
+def paragraph_text(paragraph):
+    """Text of a ``w:p`` element, matching python-docx's ``Paragraph.text``"""
+    parts = []
+    for child in _RUN_CONTENT(paragraph):
+        tag = child.tag
+        if tag == _W_T:
+            parts.append(child.text or '')
+        elif tag == _W_BR:
+            if child.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_CHARS:
+            parts.append(_RUN_CHARS[tag])
+    return ''.join(parts)
+
+def _style_name(style):
+    """UI name of a ``w:style`` element, matching python-docx's ``style.name``"""
+    names = _STYLE_NAME(style)
+    return BabelFish.internal2ui(names[0]) if names else None
+
+def _paragraph_style_names(archive):
+    """Map paragraph style ids to names, resolving the way python-docx does.
+
+    Reads word/styles.xml from the open DOCX archive. Unknown or missing ids
+    resolve to the default paragraph style, which is stored under the empty
+    string.
+    """
+    names = {}
+    default = None
+    try:
+        styles = etree.fromstring(archive.read('word/styles.xml'))
+    except KeyError:
+        styles = ()
+    for style in styles:
+        if style.tag != _W_STYLE or style.get(_W_TYPE) != 'paragraph':
+            continue
+        # The first style with an id wins; the last default one is the default
+        names.setdefault(style.get(_W_STYLE_ID), style)
+        if style.get(_W_DEFAULT) in ('1', 'true', 'on'):
+            default = style
+    names = {style_id: _style_name(style) for style_id, style in names.items()}
+    names[''] = _style_name(default) if default is not None else None
+    return names
+
+def iter_body_elements(archive):
+    """Stream the body-level ``w:p`` and ``w:tbl`` elements of an open DOCX.
+
+    Reads word/document.xml incrementally and discards each element once the
+    caller moves on, so only one paragraph or table is in memory at a time.
+    Yields, in document order, the elements behind ``Document.paragraphs``
+    and ``Document.tables``.
+    """
+    with archive.open('word/document.xml') as xml:
+        for _, element in etree.iterparse(xml, events=('end',), tag=(_W_P, _W_TBL)):
+            parent = element.getparent()
+            if parent is None or parent.tag != _W_BODY:
+                continue
+            yield element
+            element.clear()
+            # Drop already-processed siblings
+            while element.getprevious() is not None:
+                del parent[0]
+
+def iter_paragraphs(file_path):
+    """Stream the body-level ``w:p`` elements of a DOCX file.
+
+    Yields the same paragraphs, in the same order, as ``Document.paragraphs``.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        for element in iter_body_elements(archive):
+            if element.tag == _W_P:
+                yield element
+
+def iter_paragraph_text(file_path):
+    """Stream the text of each body-level paragraph in a DOCX file"""
+    for paragraph in iter_paragraphs(file_path):
+        yield paragraph_text(paragraph)
+
+def is_table(element):
+    """Whether a body element from ``iter_body_elements`` is a ``w:tbl``"""
+    return element.tag == _W_TBL
+
+def table_dimensions(table):
+    """(rows, columns) of a ``w:tbl``, as ``len(Table.rows)``/``len(Table.columns)``"""
+    return len(_TABLE_ROWS(table)), len(_GRID_COLUMNS(table))
+
+def table_cell_texts(table):
+    """Text of each slot in a ``w:tbl`` layout grid, like python-docx's ``Table._cells``.
+
+    Slots covered by a merged cell repeat that cell's text, which is built
+    only once.
+    """
+    column_count = len(_GRID_COLUMNS(table))
+    texts = []
+    for cell in _TABLE_CELLS(table):
+        merge = _V_MERGE(cell)
+        continued = bool(merge) and merge[0].get(_W_VAL, 'continue') == 'continue'
+        if not continued:
+            text = '\n'.join(paragraph_text(p) for p in cell.iterchildren(_W_P))
+        for span_idx in range(int(_GRID_SPAN(cell) or 1)):
+            if continued:
+                texts.append(texts[-column_count])
+            elif span_idx > 0:
+                texts.append(texts[-1])
+            else:
+                texts.append(text)
+    return texts
 
 def analyze_docx(file_path):
-    """Analyze DOCX document for structure and special tags"""
-    doc = Document(file_path)
+    """Analyze DOCX document for structure and special tags.
+
+    Prints the report and returns a picklable summary of it.
+    """
+    # Report lines are collected and written to stdout in one call
+    out = []
+    out.append("=" * 60)
+    out.append(f"DOCUMENT ANALYSIS: {file_path}")
+    out.append("=" * 60)
+    
+    # Look for special patterns; counts are indexed positionally
+    pattern_counts = [0] * len(_SPECIAL_PATTERNS)
+    sample_content = []
+    content_lines = []
+    texts = []
+    numbers = []
+    paragraph_count = 0
+    tables = []
+    styles_used = set()
+    fonts_used = set()
     
-    print("=" * 60)
-    print(f"DOCUMENT ANALYSIS: {file_path}")
-    print("=" * 60)
+    # One streaming pass over the archive collects text, styles, fonts and
+    # table dimensions, without building the python-docx document model
+    with zipfile.ZipFile(file_path) as archive:
+        style_names = _paragraph_style_names(archive)
+        for element in iter_body_elements(archive):
+            if element.tag == _W_TBL:
+                tables.append(table_dimensions(element))
+                continue
+            paragraph_count += 1
+            style_name = style_names.get(_STYLE_ID(element), style_names[''])
+            if style_name:
+                styles_used.add(style_name)
+            fonts_used.update(font for font in _RUN_FONTS(element) if font)
+            text = paragraph_text(element)
+            # Surrounding whitespace never affects a match, so text is only
+            # stripped when it is shown as a sample
+            if text and not text.isspace():
+                content_lines.append(text)
+                if _SPECIAL_TRIGGER.search(text):
+                    texts.append(text)
+                    numbers.append(paragraph_count)
     
-    # Analyze paragraphs
-    print("\n📄 PARAGRAPHS OVERVIEW:")
-    print(f"Total paragraphs: {len(doc.paragraphs)}")
+    # Count each special pattern over the whole document at once
+    buffer = _PARAGRAPH_SEP.join(texts)
+    for index, (literal, pattern) in enumerate(_SPECIAL_SCANS):
+        if literal in buffer:
+            pattern_counts[index] = len(pattern.findall(buffer))
     
-    # Look for special patterns (If conditions, tags, etc.)
-    special_patterns = {
-        'if_conditions': re.compile(r'\{\{#if\s+.*?\}\}|\{\{/if\}\}', re.IGNORECASE),
-        'variables': re.compile(r'\{\{[^#/].*?\}\}'),
-        'loops': re.compile(r'\{\{#each\s+.*?\}\}|\{\{/each\}\}', re.IGNORECASE),
-        'tags': re.compile(r'<[^>]+>'),
-        'merge_fields': re.compile(r'\[\[.*?\]\]'),
-    }
+    # Sample the first paragraphs holding any match
+    samples_needed = 5  # Collect first 5 samples
+    for number, text in zip(numbers, texts):
+        if _SPECIAL_PATTERN.search(text):
+            sample_content.append(f"Para {number}: {text.strip()[:150]}...")
+            samples_needed -= 1
+            if not samples_needed:
+                break
     
-    pattern_counts = {name: 0 for name in special_patterns}
-    sample_content = []
+    # Analyze paragraphs
+    out.append("\n📄 PARAGRAPHS OVERVIEW:")
+    out.append(f"Total paragraphs: {paragraph_count}")
     
-    for i, paragraph in enumerate(doc.paragraphs):
-        text = paragraph.text.strip()
-        if text:
-            # Check for special patterns
-            for pattern_name, pattern in special_patterns.items():
-                matches = pattern.findall(text)
-                if matches:
-                    pattern_counts[pattern_name] += len(matches)
-                    if len(sample_content) < 5:  # Collect first 5 samples
-                        sample_content.append(f"Para {i+1}: {text[:150]}...")
-            
-    print("\n🔍 SPECIAL PATTERNS FOUND:")
-    for pattern_name, count in pattern_counts.items():
+    out.append("\n🔍 SPECIAL PATTERNS FOUND:")
+    for (pattern_name, _, _), count in zip(_SPECIAL_PATTERNS, pattern_counts):
         if count > 0:
-            print(f"  • {pattern_name.replace('_', ' ').title()}: {count} occurrences")
+            out.append(f"  • {pattern_name.replace('_', ' ').title()}: {count} occurrences")
     
-    print("\n📝 SAMPLE CONTENT WITH SPECIAL PATTERNS:")
+    out.append("\n📝 SAMPLE CONTENT WITH SPECIAL PATTERNS:")
     for sample in sample_content[:5]:
-        print(f"  {sample}")
+        out.append(f"  {sample}")
     
     # Analyze tables
-    if doc.tables:
-        print(f"\n📊 TABLES: {len(doc.tables)} found")
-        for i, table in enumerate(doc.tables):
-            print(f"  • Table {i+1}: {len(table.rows)} rows x {len(table.columns)} columns")
+    if tables:
+        out.append(f"\n📊 TABLES: {len(tables)} found")
+        for i, (rows, columns) in enumerate(tables):
+            out.append(f"  • Table {i+1}: {rows} rows x {columns} columns")
     
     # Analyze styles
-    print("\n🎨 FORMATTING ANALYSIS:")
-    styles_used = set()
-    fonts_used = set()
-    
-    for paragraph in doc.paragraphs:
-        if paragraph.style.name:
-            styles_used.add(paragraph.style.name)
-        for run in paragraph.runs:
-            if run.font.name:
-                fonts_used.add(run.font.name)
-    
-    print(f"  • Unique styles: {len(styles_used)}")
+    out.append("\n🎨 FORMATTING ANALYSIS:")
+    out.append(f"  • Unique styles: {len(styles_used)}")
     if styles_used:
-        print(f"    Samples: {', '.join(list(styles_used)[:5])}")
-    print(f"  • Unique fonts: {len(fonts_used)}")
+        out.append(f"    Samples: {', '.join(list(styles_used)[:5])}")
+    out.append(f"  • Unique fonts: {len(fonts_used)}")
     if fonts_used:
-        print(f"    Fonts: {', '.join(fonts_used)}")
+        out.append(f"    Fonts: {', '.join(fonts_used)}")
     
     # Full content preview
-    print("\n📖 FULL CONTENT PREVIEW (first 500 chars):")
-    full_text = '\n'.join([p.text for p in doc.paragraphs if p.text.strip()])
-    print(full_text[:500] + "...")
+    out.append("\n📖 FULL CONTENT PREVIEW (first 500 chars):")
+    full_text = '\n'.join(content_lines)
+    out.append(full_text[:500] + "...")
+    sys.stdout.write('\n'.join(out) + '\n')
     
-    return doc
+    return {
+        'file': str(file_path),
+        'paragraphs': paragraph_count,
+        'patterns': {name: count for (name, _, _), count in zip(_SPECIAL_PATTERNS, pattern_counts)},
+        'samples': sample_content,
+        'tables': tables,
+        'styles': sorted(styles_used),
+        'fonts': sorted(fonts_used),
+    }
+
+def analyze_many(file_paths, max_workers=None):
+    """Analyze several DOCX files in parallel, one process per CPU core.
+
+    Each document is independent and CPU-bound, so they are spread across a
+    process pool. Summaries are returned in the order of ``file_paths``.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(analyze_docx, file_paths))
 
 if __name__ == "__main__":
-    file_path = "We refer to the telephone conversation.docx"
-    if Path(file_path).exists():
-        analyze_docx(file_path)
-    else:
-        print(f"Error: File '{file_path}' not found!")
\ No newline at end of file
+    file_paths = sys.argv[1:] or ["We refer to the telephone conversation.docx"]
+    found = []
+    for file_path in file_paths:
+        if Path(file_path).exists():
+            found.append(file_path)
+        else:
+            print(f"Error: File '{file_path}' not found!")
+    if len(found) > 1:
+        analyze_many(found)
+    elif found:
+        analyze_docx(found[0])
\ No newline at end of file
@@ -1,87 +1,140 @@
 #!/usr/bin/env python3
 """Analyze SUPLC1031.docx for Sharedo tags and content"""
 
+import sys
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from docx import Document
 import re
 
+from analyze_docx import (
+    is_table, iter_body_elements, paragraph_text, table_cell_texts, table_dimensions,
+)
+
+# Sharedo-specific patterns, compiled once per process
+_SHAREDO_PATTERNS = (
+    ('data_tags', re.compile(r'\{\{([^}]+)\}\}')),
+    ('conditionals', re.compile(r'#if\s+|#endif|#else')),
+    ('loops', re.compile(r'#foreach\s+|#endforeach')),
+    ('variables', re.compile(r'context\.[a-zA-Z.]+|document\.[a-zA-Z.]+')),
+    ('placeholders', re.compile(r'\[_+\]')),
+    ('merge_fields', re.compile(r'«([^»]+)»')),
+)
+# Any text a Sharedo pattern can match contains one of these; plain text is
+# rejected with a single search instead of six findall calls
+_SHAREDO_TRIGGER = re.compile(r'[{#\[«]|context\.|document\.')
+
 def analyze_sharedo_doc(file_path):
-    """Analyze document for Sharedo-specific patterns"""
-    doc = Document(file_path)
-    
-    print("=" * 60)
-    print(f"SHAREDO DOCUMENT ANALYSIS: {file_path}")
-    print("=" * 60)
-    
-    # Sharedo-specific patterns
-    sharedo_patterns = {
-        'data_tags': re.compile(r'\{\{([^}]+)\}\}'),
-        'conditionals': re.compile(r'#if\s+|#endif|#else'),
-        'loops': re.compile(r'#foreach\s+|#endforeach'),
-        'variables': re.compile(r'context\.[a-zA-Z.]+|document\.[a-zA-Z.]+'),
-        'placeholders': re.compile(r'\[_+\]'),
-        'merge_fields': re.compile(r'«([^»]+)»'),
-    }
+    """Analyze document for Sharedo-specific patterns.
+
+    Prints the report and returns a picklable summary of it.
+    """
+    # Report lines are collected and written to stdout in one call
+    out = []
+    out.append("=" * 60)
+    out.append(f"SHAREDO DOCUMENT ANALYSIS: {file_path}")
+    out.append("=" * 60)
     
-    findings = {name: [] for name in sharedo_patterns}
+    # Per pattern: occurrences of each distinct match, in first-seen order
+    findings = {name: Counter() for name, _ in _SHAREDO_PATTERNS}
+    totals = dict.fromkeys(findings, 0)
     full_text = []
     
+    # One streaming pass over word/document.xml collects the paragraph text
+    # and each table's layout grid, without the python-docx document model
+    paragraphs = []  # (paragraph number, stripped text), non-blank only
+    tables = []  # (rows, columns, cell texts)
+    paragraph_count = 0
+    with zipfile.ZipFile(file_path) as archive:
+        for element in iter_body_elements(archive):
+            if is_table(element):
+                tables.append((*table_dimensions(element), table_cell_texts(element)))
+                continue
+            paragraph_count += 1
+            para_text = paragraph_text(element)
+            if para_text and not para_text.isspace():
+                # Stripping matters here: '#if ' at the end of a paragraph is
+                # not a conditional
+                paragraphs.append((paragraph_count, para_text.strip()))
+    
     # Analyze paragraphs
-    print(f"\n📄 DOCUMENT STRUCTURE:")
-    print(f"  • Total paragraphs: {len(doc.paragraphs)}")
-    print(f"  • Total tables: {len(doc.tables)}")
+    out.append(f"\n📄 DOCUMENT STRUCTURE:")
+    out.append(f"  • Total paragraphs: {paragraph_count}")
+    out.append(f"  • Total tables: {len(tables)}")
     
     # Extract and analyze text
-    for i, para in enumerate(doc.paragraphs):
-        text = para.text.strip()
-        if text:
-            full_text.append(text)
-            # Check for patterns
-            for pattern_name, pattern in sharedo_patterns.items():
-                matches = pattern.findall(text)
-                if matches:
-                    findings[pattern_name].extend(matches)
-                    if len(findings[pattern_name]) <= 3:  # Show first 3 examples
-                        print(f"\n🔍 Found {pattern_name.replace('_', ' ').title()} in paragraph {i+1}:")
-                        print(f"   Text: {text[:100]}...")
+    for number, text in paragraphs:
+        full_text.append(text)
+        if not _SHAREDO_TRIGGER.search(text):
+            continue
+        # Check for patterns
+        for pattern_name, pattern in _SHAREDO_PATTERNS:
+            matches = pattern.findall(text)
+            if matches:
+                findings[pattern_name].update(matches)
+                totals[pattern_name] += len(matches)
+                if totals[pattern_name] <= 3:  # Show first 3 examples
+                    out.append(f"\n🔍 Found {pattern_name.replace('_', ' ').title()} in paragraph {number}:")
+                    out.append(f"   Text: {text[:100]}...")
     
     # Analyze tables
-    for table_idx, table in enumerate(doc.tables):
-        print(f"\n📊 TABLE {table_idx + 1}:")
-        print(f"   Dimensions: {len(table.rows)} rows × {len(table.columns)} columns")
-        for row_idx, row in enumerate(table.rows):
-            for cell_idx, cell in enumerate(row.cells):
-                cell_text = cell.text.strip()
-                if cell_text:
-                    # Check for patterns in table cells
-                    for pattern_name, pattern in sharedo_patterns.items():
-                        matches = pattern.findall(cell_text)
-                        if matches:
-                            findings[pattern_name].extend(matches)
-                            if row_idx == 0:  # Show header patterns
-                                print(f"   Cell[{row_idx},{cell_idx}]: {cell_text[:50]}...")
+    for table_idx, (row_count, column_count, cell_texts) in enumerate(tables):
+        out.append(f"\n📊 TABLE {table_idx + 1}:")
+        out.append(f"   Dimensions: {row_count} rows × {column_count} columns")
+        # cell_texts is the flat layout grid; merged cells repeat their text
+        for idx, cell_text in enumerate(cell_texts):
+            cell_text = cell_text.strip()
+            if not cell_text or not _SHAREDO_TRIGGER.search(cell_text):
+                continue
+            row_idx, cell_idx = divmod(idx, column_count)
+            # Check for patterns in table cells
+            for pattern_name, pattern in _SHAREDO_PATTERNS:
+                matches = pattern.findall(cell_text)
+                if matches:
+                    findings[pattern_name].update(matches)
+                    totals[pattern_name] += len(matches)
+                    if row_idx == 0:  # Show header patterns
+                        out.append(f"   Cell[{row_idx},{cell_idx}]: {cell_text[:50]}...")
     
     # Summary of findings
-    print("\n" + "=" * 60)
-    print("📋 SHAREDO TAG SUMMARY:")
-    print("=" * 60)
+    out.append("\n" + "=" * 60)
+    out.append("📋 SHAREDO TAG SUMMARY:")
+    out.append("=" * 60)
     
     for pattern_name, items in findings.items():
         if items:
-            unique_items = list(set(items))
-            print(f"\n{pattern_name.replace('_', ' ').upper()}:")
-            print(f"  Total: {len(items)} occurrences")
-            print(f"  Unique: {len(unique_items)}")
-            print(f"  Examples: {', '.join(unique_items[:5])}")
+            unique_items = list(items)
+            out.append(f"\n{pattern_name.replace('_', ' ').upper()}:")
+            out.append(f"  Total: {totals[pattern_name]} occurrences")
+            out.append(f"  Unique: {len(unique_items)}")
+            out.append(f"  Examples: {', '.join(unique_items[:5])}")
     
     # Show document preview
-    print("\n📖 DOCUMENT PREVIEW (first 1000 chars):")
-    print("-" * 40)
+    out.append("\n📖 DOCUMENT PREVIEW (first 1000 chars):")
+    out.append("-" * 40)
     full_doc_text = '\n'.join(full_text)
-    print(full_doc_text[:1000])
+    out.append(full_doc_text[:1000])
+    sys.stdout.write('\n'.join(out) + '\n')
     
-    return doc, findings
+    return {
+        'file': str(file_path),
+        'findings': findings,
+        'totals': totals,
+    }
+
+def analyze_many(file_paths, max_workers=None):
+    """Analyze several documents in parallel, one process per CPU core.
+
+    Summaries are returned in the order of ``file_paths``.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(analyze_sharedo_doc, file_paths))
 
 if __name__ == "__main__":
-    doc, findings = analyze_sharedo_doc("SUPLC1031.docx")
+    file_paths = sys.argv[1:] or ["SUPLC1031.docx"]
+    if len(file_paths) > 1:
+        analyze_many(file_paths)
+    else:
+        analyze_sharedo_doc(file_paths[0])
     print("\n✅ Analysis complete!")
\ No newline at end of file
@@ -2,36 +2,29 @@
 Changelog route for the DOCX to HTML Converter
 """
 
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from email.utils import formatdate
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, Response
 from pathlib import Path
 import markdown
 
+from .http_cache import not_modified
+
 router = APIRouter()
 
-@router.get("/changelog", response_class=HTMLResponse)
-async def get_changelog():
-    """
-    Display the changelog in a formatted HTML page
-    """
-    # Read the changelog file
-    changelog_path = Path(__file__).parent.parent / "CHANGELOG.md"
-    
-    if not changelog_path.exists():
-        return HTMLResponse(content="<h1>Changelog not found</h1>", status_code=404)
-    
-    # Read and convert markdown to HTML
-    with open(changelog_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
-    
-    # Convert markdown to HTML with extensions
-    html_content = markdown.markdown(
-        markdown_content,
-        extensions=['extra', 'codehilite', 'toc', 'tables']
-    )
-    
-    # Create full HTML page with Alterspective styling
-    full_html = f"""
+CHANGELOG_PATH = Path(__file__).parent.parent / "CHANGELOG.md"
+
+# Converter with extensions loaded once at import; reset() between renders
+_MARKDOWN = markdown.Markdown(extensions=['extra', 'codehilite', 'toc', 'tables'])
+
+# (mtime, UTF-8 encoded page) of the last render; the changelog only changes
+# on deploy, so the page is encoded once rather than per response
+_changelog_cache = None
+
+
+# Full HTML page with Alterspective styling, split around the rendered
+# markdown so a render is two concatenations instead of a large f-string
+_HTML_PREFIX = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -42,62 +35,62 @@ async def get_changelog():
         <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css" rel="stylesheet">
         <link href="/static/css/alterspective.css" rel="stylesheet">
         <style>
-            body {{
+            body {
                 font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 min-height: 100vh;
-            }}
-            .changelog-container {{
+            }
+            .changelog-container {
                 max-width: 1000px;
                 margin: 2rem auto;
                 padding: 2rem;
                 background: rgba(255, 255, 255, 0.95);
                 border-radius: 16px;
                 box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-            }}
-            .navbar {{
+            }
+            .navbar {
                 background: var(--navy) !important;
-            }}
-            h1 {{
+            }
+            h1 {
                 color: var(--navy);
                 border-bottom: 3px solid var(--citrus);
                 padding-bottom: 1rem;
                 margin-bottom: 2rem;
-            }}
-            h2 {{
+            }
+            h2 {
                 color: var(--marine);
                 margin-top: 2rem;
                 margin-bottom: 1rem;
-            }}
-            h3 {{
+            }
+            h3 {
                 color: var(--green);
                 margin-top: 1.5rem;
                 margin-bottom: 0.75rem;
-            }}
-            h4 {{
+            }
+            h4 {
                 color: var(--navy);
                 margin-top: 1rem;
                 margin-bottom: 0.5rem;
-            }}
-            ul {{
+            }
+            ul {
                 margin-bottom: 1rem;
-            }}
-            li {{
+            }
+            li {
                 margin-bottom: 0.5rem;
-            }}
-            code {{
+            }
+            code {
                 background: rgba(0, 0, 0, 0.05);
                 padding: 2px 6px;
                 border-radius: 4px;
                 font-size: 0.9em;
-            }}
-            pre {{
+            }
+            pre {
                 background: #f8f9fa;
                 padding: 1rem;
                 border-radius: 8px;
                 overflow-x: auto;
-            }}
-            .back-button {{
+            }
+            .back-button {
                 display: inline-block;
                 margin-bottom: 2rem;
                 padding: 0.5rem 1.5rem;
@@ -106,32 +99,32 @@ async def get_changelog():
                 text-decoration: none;
                 border-radius: 8px;
                 transition: all 0.3s ease;
-            }}
-            .back-button:hover {{
+            }
+            .back-button:hover {
                 background: var(--green);
                 color: white;
                 transform: translateX(-5px);
-            }}
-            hr {{
+            }
+            hr {
                 margin: 2rem 0;
                 border-color: rgba(0, 0, 0, 0.1);
-            }}
-            table {{
+            }
+            table {
                 width: 100%;
                 margin: 1rem 0;
                 border-collapse: collapse;
-            }}
-            th, td {{
+            }
+            th, td {
                 padding: 0.75rem;
                 border: 1px solid #dee2e6;
-            }}
-            th {{
+            }
+            th {
                 background: var(--navy);
                 color: white;
-            }}
-            tr:nth-child(even) {{
+            }
+            tr:nth-child(even) {
                 background: #f8f9fa;
-            }}
+            }
         </style>
     </head>
     <body>
@@ -156,12 +149,64 @@ async def get_changelog():
             <a href="/" class="back-button">
                 <i class="fas fa-arrow-left"></i> Back to Home
             </a>
-            {html_content}
+            """
+
+_HTML_SUFFIX = """
         </div>
         
         <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>
     </body>
     </html>
     """
+
+
+def _render_changelog(markdown_content: str) -> str:
+    """Render the changelog markdown into the full HTML page"""
+    # Convert markdown to HTML, reusing the configured converter
+    html_content = _MARKDOWN.reset().convert(markdown_content)
+    
+    # Wrap in the full HTML page with Alterspective styling
+    return _HTML_PREFIX + html_content + _HTML_SUFFIX
+
+
+def _refresh_changelog() -> float:
+    """Re-render the cached page if CHANGELOG.md has changed; return its mtime"""
+    global _changelog_cache
+    
+    mtime = CHANGELOG_PATH.stat().st_mtime
+    if _changelog_cache is None or _changelog_cache[0] != mtime:
+        markdown_content = CHANGELOG_PATH.read_bytes().decode('utf-8')
+        _changelog_cache = (mtime, _render_changelog(markdown_content).encode('utf-8'))
+    return mtime
+
+
+# Render at import so the first request is served from the cache
+try:
+    _refresh_changelog()
+except FileNotFoundError:
+    pass
+
+
+@router.get("/changelog", response_class=HTMLResponse)
+async def get_changelog(request: Request):
+    """
+    Display the changelog in a formatted HTML page
+    """
+    try:
+        mtime = _refresh_changelog()
+    except FileNotFoundError:
+        return HTMLResponse(content="<h1>Changelog not found</h1>", status_code=404)
     
-    return HTMLResponse(content=full_html)
\ No newline at end of file
+    headers = {
+        "ETag": f'"{mtime}"',
+        "Last-Modified": formatdate(mtime, usegmt=True),
+        "Cache-Control": "public, max-age=300",
+    }
+    if not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(
+        content=_changelog_cache[1],
+        media_type="text/html; charset=utf-8",
+        headers=headers,
+    )
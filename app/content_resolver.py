@@ -13,17 +13,120 @@ World-class implementation with caching, error handling, and performance optimiz
 
 import re
 import os
-import hashlib
+import sys
 import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
-from collections import defaultdict
+from types import MappingProxyType
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from docx import Document
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
 
 logger = logging.getLogger(__name__)
 
+# A resolution step: a generator that yields the nested steps it needs and
+# returns its result (see ContentControlResolver._run)
+ResolutionSteps = Generator['ResolutionSteps', Any, Any]
+
+try:
+    from lxml import etree
+    _SOUP_PARSER = 'lxml'
+except ImportError:
+    import xml.etree.ElementTree as etree
+    _SOUP_PARSER = 'html.parser'
+
+# Body of a Word content control (w:sdt) in WordprocessingML
+_W_SDT_CONTENT = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}sdtContent'
+
+# Common locations, relative to the base path, searched for references
+_COMMON_LOCATIONS = (
+    'templates',
+    'Common/Content Blocks',
+    'Content Blocks',
+    'Documents',
+    'Samples/templates'
+)
+
+# Known content block names (lowercase) mapped to their files
+_BLOCK_MAP = MappingProxyType({
+    'dc-letterheader': 'Common/Content Blocks/LetterHeader.docx',
+    'dc-letteraddress': 'Common/Content Blocks/DC LetterAddress.docx',
+    'dc-lettersignoff': 'Common/Content Blocks/DC LetterSignoff.docx',
+    'dc-footer': 'Common/Content Blocks/DC Footer.docx',
+    'letterheader': 'Common/Content Blocks/LetterHeader.docx',
+    'letterfooter': 'Common/Content Blocks/LetterFooter.docx',
+    'letteraddress': 'Common/Content Blocks/LetterAddress.docx',
+    'lettersignoff': 'Common/Content Blocks/LetterSignoff.docx'
+})
+
+
+# Resolved reference paths remembered per resolver
+_PATH_CACHE_SIZE = 1024
+
+
+def _probe_path(base_path: str, search_roots: Tuple[str, ...],
+                ref_path: str) -> Optional[str]:
+    """
+    Find the file a reference points at, using os.path rather than pathlib.
+    """
+    # Try as absolute path
+    if os.path.isabs(ref_path) and os.path.exists(ref_path):
+        return ref_path
+    
+    # Try relative to base path
+    path = os.path.join(base_path, ref_path)
+    if os.path.exists(path):
+        return path
+    
+    # Try common locations
+    for root in search_roots:
+        path = os.path.join(root, ref_path)
+        if os.path.exists(path):
+            return path
+        
+        # Try with .docx extension
+        path_with_ext = os.path.splitext(path)[0] + '.docx'
+        if os.path.exists(path_with_ext):
+            return path_with_ext
+    
+    return None
+
+
+def _normalize_ref(ref_path: str) -> str:
+    """
+    Canonical form of a textual reference path: surrounding whitespace and
+    quotes removed, interned so the many dict and set lookups keyed by it
+    compare by identity.
+    """
+    return sys.intern(ref_path.strip().strip('\'"'))
+
+
+# SharerdoWordConverter, bound on first conversion: .converter is not
+# importable in every deployment, so it cannot be imported with the module
+_converter_class = None
+
+
+def _get_converter_class():
+    """Return SharerdoWordConverter, importing it on the first call only."""
+    global _converter_class
+    if _converter_class is None:
+        from .converter import SharerdoWordConverter
+        _converter_class = SharerdoWordConverter
+    return _converter_class
+
+
+# Inner content of the <body> element in converter output
+_BODY_PATTERN = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+
+# Attribute names are case-insensitive in HTML, and the parsers lowercase them
+_CC_ATTRIBUTE = re.compile('data-content-control', re.IGNORECASE)
+
+# Only elements carrying a content control reference are kept when scanning
+_CC_STRAINER = SoupStrainer(attrs={'data-content-control': True})
+
 
 class ContentControlResolver:
     """
@@ -31,28 +134,76 @@ class ContentControlResolver:
     Achieves 100% resolution rate with <100ms overhead per document.
     """
     
+    # Fixed attribute layout: no per-instance __dict__, and the attributes
+    # read on every resolution are slot lookups
+    __slots__ = (
+        'base_path', '_base_path_str', '_search_roots', 'max_depth',
+        'cache', '_conversions', '_executor', '_local', '_path_cache',
+        'max_cache_bytes', '_cache_bytes', '_block_index', 'dependency_graph', 'resolution_stack', '_resolution_set',
+        'statistics'
+    )
+    
     # Content control patterns to detect
     PATTERNS = {
         'double_curly': re.compile(r'\{\{content:([^}]+)\}\}', re.IGNORECASE),
         'content_block': re.compile(r'\{\{(dc-[^}]+)\}\}', re.IGNORECASE),
         'include_directive': re.compile(r'@include\(([^)]+)\)', re.IGNORECASE),
-        'sharedo_content': re.compile(r'\[content:([^\]]+)\]', re.IGNORECASE),
-        'word_content_control': re.compile(r'<w:sdtContent[^>]*>.*?</w:sdtContent>', re.DOTALL)
+        'sharedo_content': re.compile(r'\[content:([^\]]+)\]', re.IGNORECASE)
     }
     
-    def __init__(self, base_path: str = None, max_depth: int = 5):
+    # The four textual reference patterns as one alternation, so content is
+    # scanned once; the named group that matched gives the reference type
+    REFERENCE_PATTERN = re.compile(
+        r'\{\{content:(?P<double_curly>[^}]+)\}\}'
+        r'|\{\{(?P<content_block>dc-[^}]+)\}\}'
+        r'|@include\((?P<include_directive>[^)]+)\)'
+        r'|\[content:(?P<sharedo_content>[^\]]+)\]',
+        re.IGNORECASE
+    )
+    
+    # Div recording where resolved content came from (see _wrap_content)
+    WRAP_TEMPLATE = (
+        '\n        <div class="resolved-content" data-source="{src}" data-type="{typ}">'
+        '\n            {body}'
+        '\n        </div>'
+        '\n        '
+    )
+    
+    # BeautifulSoup tree builder for read-only parsing, chosen once at import:
+    # lxml's C parser when installed, otherwise the pure-Python html.parser
+    SOUP_PARSER = _SOUP_PARSER
+    
+    def __init__(self, base_path: str = None, max_depth: int = 5,
+                 max_cache_bytes: int = 64 * 1024 * 1024):
         """
         Initialize content resolver with caching and depth limits.
         
         Args:
             base_path: Base directory for resolving relative paths
             max_depth: Maximum recursion depth to prevent infinite loops
+            max_cache_bytes: Size budget for cached resolved content and
+                converted fragments; least recently used entries are
+                evicted beyond it
         """
         self.base_path = Path(base_path) if base_path else Path.cwd()
+        self._base_path_str = str(self.base_path)
+        self._search_roots = tuple(
+            os.path.join(self._base_path_str, location) for location in _COMMON_LOCATIONS
+        )
         self.max_depth = max_depth
-        self.cache = {}  # Cache resolved content by hash
+        # Resolved content by (ref_type, ref_path), and converted DOCX
+        # fragments by ('fragment', resolved path), in LRU order
+        self.cache = OrderedDict()
+        self.max_cache_bytes = max_cache_bytes
+        self._cache_bytes = 0  # Size of the cached content
+        self._conversions: Dict[Path, Future] = {}  # Prefetched DOCX conversions
+        self._executor = None  # Conversion thread pool, created on first prefetch
+        self._local = threading.local()  # Per-thread converter instances
+        self._path_cache: Dict[str, str] = {}  # Found files by reference path
+        self._block_index: Optional[Dict[str, str]] = None  # Block files by lowercased stem
         self.dependency_graph = defaultdict(set)  # Track document dependencies
         self.resolution_stack = []  # Track current resolution path
+        self._resolution_set: Set[str] = set()  # Same paths, for membership tests
         self.statistics = {
             'cache_hits': 0,
             'cache_misses': 0,
@@ -71,6 +222,57 @@ class ContentControlResolver:
             html_content: Initial HTML content
             depth: Current recursion depth
             
+        Returns:
+            Tuple of (resolved HTML, statistics)
+        """
+        return self._run(self._resolve_steps(doc_path, html_content, depth))
+    
+    def _run(self, steps: ResolutionSteps) -> Any:
+        """
+        Drive resolution steps to completion without recursing.
+        
+        Each step yields the nested step it needs (e.g. a referenced DOCX
+        with references of its own) and receives that step's result.
+        Suspended steps wait on an explicit stack, so nesting costs no Python
+        call frames and is not bound by the interpreter's recursion limit.
+        Exceptions propagate to the waiting parent step, as with a call.
+        
+        Args:
+            steps: Top-level resolution step
+            
+        Returns:
+            The top-level step's return value
+        """
+        stack = [steps]
+        value, error = None, None
+        
+        while stack:
+            try:
+                if error is None:
+                    nested = stack[-1].send(value)
+                else:
+                    nested = stack[-1].throw(error)
+            except StopIteration as done:
+                stack.pop()
+                value, error = done.value, None
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                value, error = None, e
+                continue
+            
+            stack.append(nested)
+            value, error = None, None
+        
+        return value
+    
+    def _resolve_steps(self, doc_path: str, html_content: str,
+                       depth: int) -> ResolutionSteps:
+        """
+        Resolution step for resolve_document; run via _run.
+        
         Returns:
             Tuple of (resolved HTML, statistics)
         """
@@ -79,12 +281,13 @@ class ContentControlResolver:
             return html_content, {'error': 'max_depth_exceeded'}
         
         # Check for circular reference
-        if doc_path in self.resolution_stack:
+        if doc_path in self._resolution_set:
             self.statistics['circular_references'] += 1
             logger.warning(f"Circular reference detected: {doc_path}")
             return html_content, {'error': 'circular_reference'}
         
         self.resolution_stack.append(doc_path)
+        self._resolution_set.add(doc_path)
         self.statistics['total_resolutions'] += 1
         
         try:
@@ -94,37 +297,73 @@ class ContentControlResolver:
             if not references:
                 return html_content, {'references_found': 0}
             
+            # Convert referenced DOCX files concurrently ahead of resolution
+            self._prefetch_conversions(references)
+            
             # Resolve each reference
             resolved_html = html_content
+            cache = self.cache
+            dependency_graph = self.dependency_graph
+            
+            # Textual replacements are applied together in one pass; data
+            # attribute references need tree surgery and are embedded after
+            replacements = {}
+            attribute_contents = []
+            
+            # Counted in locals and added to self.statistics once, after the
+            # loop (nested resolutions update it in between, so add, not set)
+            hits = misses = resolved = failed = 0
+            try:
+                for ref_type, ref_path in references:
+                    cache_key = self._generate_cache_key(ref_type, ref_path)
+                    resolved_content = cache.get(cache_key)
+                    if resolved_content is not None:
+                        cache.move_to_end(cache_key)
+                        hits += 1
+                    else:
+                        misses += 1
+                        resolved_content = yield self._resolve_single_reference(
+                            ref_type, ref_path, depth + 1
+                        )
+                    
+                    if resolved_content:
+                        if ref_type == 'data_attribute':
+                            attribute_contents.append((ref_path, resolved_content))
+                        else:
+                            replacements[(ref_type, ref_path)] = self._wrap_content(
+                                ref_type, ref_path, resolved_content
+                            )
+                        resolved += 1
+                        
+                        # Track dependency
+                        dependency_graph[doc_path].add(ref_path)
+                    else:
+                        failed += 1
+            finally:
+                stats = self.statistics
+                stats['cache_hits'] += hits
+                stats['cache_misses'] += misses
+                stats['failed_resolutions'] += failed
+            
             resolution_stats = {
                 'references_found': len(references),
-                'resolved': 0,
-                'failed': 0,
+                'resolved': resolved,
+                'failed': failed,
                 'from_cache': 0
             }
             
-            for ref_type, ref_path in references:
-                resolved_content = self._resolve_single_reference(
-                    ref_type, ref_path, depth + 1
+            # Replace references with resolved content
+            if replacements:
+                resolved_html = self._substitute_references(resolved_html, replacements)
+            for ref_path, resolved_content in attribute_contents:
+                resolved_html = self._embed_content(
+                    resolved_html, 'data_attribute', ref_path, resolved_content
                 )
-                
-                if resolved_content:
-                    # Replace reference with resolved content
-                    resolved_html = self._embed_content(
-                        resolved_html, ref_type, ref_path, resolved_content
-                    )
-                    resolution_stats['resolved'] += 1
-                    
-                    # Track dependency
-                    self.dependency_graph[doc_path].add(ref_path)
-                else:
-                    resolution_stats['failed'] += 1
-                    self.statistics['failed_resolutions'] += 1
             
             return resolved_html, resolution_stats
             
         finally:
-            self.resolution_stack.pop()
+            self._resolution_set.discard(self.resolution_stack.pop())
     
     def _extract_references(self, content: str) -> List[Tuple[str, str]]:
         """
@@ -139,36 +378,58 @@ class ContentControlResolver:
         if not content:
             return references
         
-        # Check each pattern type
-        for pattern_name, pattern in self.PATTERNS.items():
-            if pattern_name == 'word_content_control':
-                # Special handling for Word XML content controls
-                continue  # Handled separately in document parsing
-            
-            matches = pattern.findall(str(content))
-            for match in matches:
-                references.append((pattern_name, match))
+        if not isinstance(content, str):
+            content = str(content)
+        
+        # Textual references in a single pass (Word XML content controls are
+        # handled separately in document parsing)
+        for match in self.REFERENCE_PATTERN.finditer(content):
+            ref_type = match.lastgroup
+            references.append((ref_type, _normalize_ref(match.group(ref_type))))
         
-        # Also check BeautifulSoup parsed content for data attributes
-        if '<' in content:  # Only parse if it looks like HTML
+        # Also check BeautifulSoup parsed content for data attributes; a cheap
+        # search rules out most documents without building a parser
+        if _CC_ATTRIBUTE.search(content):
             try:
-                soup = BeautifulSoup(content, 'html.parser')
+                # Build only the elements that carry the attribute
+                soup = self._make_soup(content, parse_only=_CC_STRAINER)
                 
-                # Find elements with content control attributes
+                # Find elements with content control attributes (including
+                # ones nested inside another matched element)
                 for elem in soup.find_all(attrs={'data-content-control': True}):
                     ref = elem.get('data-content-control')
                     if ref:
-                        references.append(('data_attribute', ref))
+                        # Kept verbatim: _embed_content matches the element
+                        # by its exact attribute value
+                        references.append(('data_attribute', sys.intern(ref)))
                         
             except Exception as e:
                 logger.debug(f"HTML parsing for references failed: {e}")
         
         return references
     
+    def _extract_sdt_content(self, xml_bytes: bytes) -> List[str]:
+        """
+        Extract the bodies of Word content controls from WordprocessingML.
+        
+        Args:
+            xml_bytes: XML part of a DOCX package, e.g. word/document.xml
+            
+        Returns:
+            Each w:sdtContent element serialized as XML, in document order
+            (content controls nested in another are returned as well)
+        """
+        root = etree.fromstring(xml_bytes)
+        return [
+            etree.tostring(elem, encoding='unicode')
+            for elem in root.iter(_W_SDT_CONTENT)
+        ]
+    
     def _resolve_single_reference(self, ref_type: str, ref_path: str, 
-                                 depth: int) -> Optional[str]:
+                                 depth: int) -> ResolutionSteps:
         """
-        Resolve a single content control reference.
+        Resolve a content control reference missing from the cache
+        (resolution step).
         
         Args:
             ref_type: Type of reference (pattern name)
@@ -178,40 +439,55 @@ class ContentControlResolver:
         Returns:
             Resolved HTML content or None if failed
         """
-        # Generate cache key
-        cache_key = self._generate_cache_key(ref_type, ref_path)
-        
-        # Check cache
-        if cache_key in self.cache:
-            self.statistics['cache_hits'] += 1
-            return self.cache[cache_key]
-        
-        self.statistics['cache_misses'] += 1
-        
         # Resolve based on reference type
         resolved_content = None
         
         if ref_type in ['double_curly', 'include_directive', 'sharedo_content']:
             # File-based reference
-            resolved_content = self._load_and_convert_document(ref_path, depth)
+            resolved_content = yield self._load_and_convert_document(ref_path, depth)
             
         elif ref_type == 'content_block':
             # Named content block (e.g., dc-letterheader)
-            resolved_content = self._load_content_block(ref_path, depth)
+            resolved_content = yield self._load_content_block(ref_path, depth)
             
         elif ref_type == 'data_attribute':
             # Data attribute reference
-            resolved_content = self._load_referenced_content(ref_path, depth)
+            resolved_content = yield self._load_referenced_content(ref_path, depth)
         
         # Cache the result
         if resolved_content:
-            self.cache[cache_key] = resolved_content
+            self._cache_content(self._generate_cache_key(ref_type, ref_path), resolved_content)
         
         return resolved_content
     
-    def _load_and_convert_document(self, ref_path: str, depth: int) -> Optional[str]:
+    def _cache_content(self, cache_key: Tuple[str, Any], content: str):
         """
-        Load and convert a referenced document to HTML.
+        Cache resolved content, evicting least recently used entries to
+        stay within max_cache_bytes.
+        
+        Args:
+            cache_key: (ref_type, ref_path) or fragment cache key
+            content: Resolved content
+        """
+        cache = self.cache
+        previous = cache.pop(cache_key, None)
+        if previous is not None:
+            self._cache_bytes -= len(previous)
+        
+        # Content larger than the whole budget is not worth keeping
+        if len(content) > self.max_cache_bytes:
+            return
+        
+        cache[cache_key] = content
+        self._cache_bytes += len(content)
+        
+        while self._cache_bytes > self.max_cache_bytes:
+            _, evicted = cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+    
+    def _load_and_convert_document(self, ref_path: str, depth: int) -> ResolutionSteps:
+        """
+        Load and convert a referenced document to HTML (resolution step).
         
         Args:
             ref_path: Path to the document
@@ -230,37 +506,35 @@ class ContentControlResolver:
             
             # Check if it's a DOCX file
             if full_path.suffix.lower() == '.docx':
-                # Convert DOCX to HTML fragment
-                from .converter import SharerdoWordConverter
+                # The same file is often reached through several reference
+                # spellings (e.g. dc-letterheader and its path); convert once
+                fragment_key = self._fragment_key(full_path)
+                conversion = self._conversions.pop(full_path, None)
+                fragment = self.cache.get(fragment_key)
+                if fragment is not None:
+                    # A prefetch made redundant by the cache is dropped unused
+                    if conversion is not None:
+                        conversion.cancel()
+                    self.cache.move_to_end(fragment_key)
+                    return fragment
                 
-                converter = SharerdoWordConverter()
-                with open(full_path, 'rb') as f:
-                    result = converter.convert(f.read())
+                # Convert DOCX to HTML fragment, or collect the prefetched one
+                if conversion is not None:
+                    fragment = conversion.result()
+                else:
+                    fragment = self._convert_file(full_path)
                 
-                if result.get('success'):
-                    # Extract just the body content as a fragment
-                    html = result.get('html_content', '')
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Get body content or main content
-                    body = soup.find('body')
-                    if body:
-                        # Return inner content without body tag
-                        fragment = ''.join(str(child) for child in body.children)
-                    else:
-                        # Return all content if no body tag
-                        fragment = str(soup)
-                    
+                if fragment is not None:
                     # Recursively resolve any nested references
                     if depth < self.max_depth:
-                        fragment, _ = self.resolve_document(str(full_path), fragment, depth)
+                        fragment, _ = yield self._resolve_steps(str(full_path), fragment, depth)
                     
+                    self._cache_content(fragment_key, fragment)
                     return fragment
             
             elif full_path.suffix.lower() in ['.html', '.htm']:
                 # Load HTML fragment directly
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return full_path.read_text(encoding='utf-8')
             
             else:
                 logger.warning(f"Unsupported file type: {full_path.suffix}")
@@ -270,9 +544,9 @@ class ContentControlResolver:
             logger.error(f"Error loading document {ref_path}: {e}")
             return None
     
-    def _load_content_block(self, block_name: str, depth: int) -> Optional[str]:
+    def _load_content_block(self, block_name: str, depth: int) -> ResolutionSteps:
         """
-        Load a named content block (e.g., dc-letterheader).
+        Load a named content block, e.g. dc-letterheader (resolution step).
         
         Args:
             block_name: Name of the content block
@@ -281,36 +555,33 @@ class ContentControlResolver:
         Returns:
             HTML fragment or None
         """
-        # Map content block names to file paths
-        content_block_mappings = {
-            'dc-letterheader': 'Common/Content Blocks/LetterHeader.docx',
-            'dc-letteraddress': 'Common/Content Blocks/DC LetterAddress.docx',
-            'dc-lettersignoff': 'Common/Content Blocks/DC LetterSignoff.docx',
-            'dc-footer': 'Common/Content Blocks/DC Footer.docx',
-            'letterheader': 'Common/Content Blocks/LetterHeader.docx',
-            'letterfooter': 'Common/Content Blocks/LetterFooter.docx',
-            'letteraddress': 'Common/Content Blocks/LetterAddress.docx',
-            'lettersignoff': 'Common/Content Blocks/LetterSignoff.docx'
-        }
+        relative_path = self._content_block_path(block_name)
+        if relative_path:
+            return (yield self._load_and_convert_document(relative_path, depth))
         
-        # Normalize block name
-        normalized_name = block_name.lower().strip()
+        logger.warning(f"Content block not found: {block_name}")
+        return None
+    
+    def _content_block_path(self, block_name: str) -> Optional[str]:
+        """
+        Find the file holding a named content block.
         
-        if normalized_name in content_block_mappings:
-            relative_path = content_block_mappings[normalized_name]
-            return self._load_and_convert_document(relative_path, depth)
+        Args:
+            block_name: Name of the content block
+            
+        Returns:
+            Path of the block relative to the base path, or None
+        """
+        relative_path = _BLOCK_MAP.get(block_name.lower().strip())
+        if relative_path is not None:
+            return relative_path
         
         # Try to find the file by searching
-        search_path = self._find_content_block_file(block_name)
-        if search_path:
-            return self._load_and_convert_document(search_path, depth)
-        
-        logger.warning(f"Content block not found: {block_name}")
-        return None
+        return self._find_content_block_file(block_name)
     
-    def _load_referenced_content(self, ref_id: str, depth: int) -> Optional[str]:
+    def _load_referenced_content(self, ref_id: str, depth: int) -> ResolutionSteps:
         """
-        Load content referenced by ID or path.
+        Load content referenced by ID or path (resolution step).
         
         Args:
             ref_id: Reference identifier
@@ -320,12 +591,12 @@ class ContentControlResolver:
             HTML fragment or None
         """
         # Try as direct path first
-        content = self._load_and_convert_document(ref_id, depth)
+        content = yield self._load_and_convert_document(ref_id, depth)
         if content:
             return content
         
         # Try as content block name
-        content = self._load_content_block(ref_id, depth)
+        content = yield self._load_content_block(ref_id, depth)
         if content:
             return content
         
@@ -333,6 +604,127 @@ class ContentControlResolver:
         logger.warning(f"Unable to resolve reference: {ref_id}")
         return None
     
+    def _convert_file(self, full_path: Path) -> Optional[str]:
+        """
+        Convert a DOCX file to an HTML fragment.
+        
+        Safe to call from worker threads: each thread uses its own converter
+        and no resolver state is touched.
+        
+        Args:
+            full_path: Resolved path of the DOCX file
+            
+        Returns:
+            Body content of the converted HTML, or None if conversion failed
+        """
+        converter = getattr(self._local, 'converter', None)
+        if converter is None:
+            converter = self._local.converter = _get_converter_class()()
+        
+        result = converter.convert(full_path.read_bytes())
+        
+        if not result.get('success'):
+            return None
+        
+        # Extract just the body content as a fragment; the converter's
+        # output is well-formed, so no parse is needed
+        html = result.get('html_content', '')
+        body = _BODY_PATTERN.search(html)
+        # Return inner content without body tag, or all content if there is
+        # no body tag
+        return body.group(1) if body else html
+    
+    def _reference_target(self, ref_type: str, ref_path: str) -> Optional[Path]:
+        """
+        Find the file a reference will load, without loading it.
+        
+        Args:
+            ref_type: Type of reference
+            ref_path: Reference path/identifier
+            
+        Returns:
+            Resolved Path or None
+        """
+        if ref_type != 'content_block':
+            full_path = self._resolve_path(ref_path)
+            if full_path or ref_type != 'data_attribute':
+                return full_path
+        
+        relative_path = self._content_block_path(ref_path)
+        return self._resolve_path(relative_path) if relative_path else None
+    
+    def _prefetch_conversions(self, references: List[Tuple[str, str]]):
+        """
+        Start converting the DOCX files behind a document's references.
+        
+        Conversion is dominated by unzipping and XML parsing, which release
+        the GIL, so the files are converted concurrently in worker threads.
+        Resolution itself (cache, statistics, dependency graph and cycle
+        detection) stays on the calling thread, in reference order, and
+        collects each conversion when it reaches it.
+        
+        Args:
+            references: (reference_type, reference_path) tuples
+        """
+        targets = []
+        for ref_type, ref_path in references:
+            if self._generate_cache_key(ref_type, ref_path) in self.cache:
+                continue
+            full_path = self._reference_target(ref_type, ref_path)
+            if (full_path is not None
+                    and full_path.suffix.lower() == '.docx'
+                    and self._fragment_key(full_path) not in self.cache
+                    and full_path not in self._conversions
+                    and full_path not in targets):
+                targets.append(full_path)
+        
+        # A single conversion gains nothing from a worker thread
+        if len(targets) < 2:
+            return
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix='content-resolver'
+            )
+        for full_path in targets:
+            self._conversions[full_path] = self._executor.submit(self._convert_file, full_path)
+    
+    def _wrap_content(self, ref_type: str, ref_path: str, content: str) -> str:
+        """
+        Wrap resolved content in a div recording where it came from.
+        
+        Args:
+            ref_type: Type of reference
+            ref_path: Reference path/identifier
+            content: Resolved content to embed
+            
+        Returns:
+            Wrapped HTML fragment
+        """
+        return self.WRAP_TEMPLATE.format_map(
+            {'src': ref_path, 'typ': ref_type, 'body': content}
+        )
+    
+    def _substitute_references(self, html: str,
+                               replacements: Dict[Tuple[str, str], str]) -> str:
+        """
+        Replace textual references in a single pass over the HTML.
+        
+        Args:
+            html: Original HTML
+            replacements: Wrapped content keyed by (ref_type, normalized ref_path)
+            
+        Returns:
+            HTML with every resolved textual reference replaced
+        """
+        def replace(match):
+            ref_type = match.lastgroup
+            return replacements.get(
+                (ref_type, _normalize_ref(match.group(ref_type))), match.group(0)
+            )
+        
+        return self.REFERENCE_PATTERN.sub(replace, html)
+    
     def _embed_content(self, html: str, ref_type: str, ref_path: str, 
                       content: str) -> str:
         """
@@ -348,41 +740,40 @@ class ContentControlResolver:
             HTML with embedded content
         """
         # Wrap content in a div with metadata
-        wrapped_content = f'''
-        <div class="resolved-content" data-source="{ref_path}" data-type="{ref_type}">
-            {content}
-        </div>
-        '''
+        wrapped_content = self._wrap_content(ref_type, ref_path, content)
         
-        # Replace the reference with content
-        if ref_type == 'double_curly':
-            pattern = f'{{{{{ref_path}}}}}'
-            html = html.replace(pattern, wrapped_content)
-            
-        elif ref_type == 'content_block':
-            pattern = f'{{{{{ref_path}}}}}'
-            html = html.replace(pattern, wrapped_content)
-            
-        elif ref_type == 'include_directive':
-            pattern = f'@include({ref_path})'
-            html = html.replace(pattern, wrapped_content)
-            
-        elif ref_type == 'sharedo_content':
-            pattern = f'[content:{ref_path}]'
-            html = html.replace(pattern, wrapped_content)
-            
-        elif ref_type == 'data_attribute':
-            # Use BeautifulSoup for HTML manipulation
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            for elem in soup.find_all(attrs={'data-content-control': ref_path}):
-                # Replace element content
-                new_elem = BeautifulSoup(wrapped_content, 'html.parser')
-                elem.replace_with(new_elem)
-            
-            html = str(soup)
+        if ref_type != 'data_attribute':
+            # Textual reference
+            return self._substitute_references(html, {(ref_type, ref_path): wrapped_content})
+        
+        # Use BeautifulSoup for HTML manipulation. This stays on html.parser:
+        # lxml wraps fragments in <html><body>, which would leak into the
+        # re-serialized output.
+        soup = BeautifulSoup(html, 'html.parser')
         
-        return html
+        for elem in soup.find_all(attrs={'data-content-control': ref_path}):
+            # Replace element content
+            new_elem = BeautifulSoup(wrapped_content, 'html.parser')
+            elem.replace_with(new_elem)
+        
+        return str(soup)
+    
+    def _make_soup(self, markup, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """
+        Parse markup for reading with the fastest available tree builder.
+        
+        Args:
+            markup: HTML as str or UTF-8 bytes
+            parse_only: Optional strainer limiting which elements are built
+            
+        Returns:
+            Parsed BeautifulSoup tree
+        """
+        if isinstance(markup, bytes):
+            # Skip encoding detection; converter output is always UTF-8
+            return BeautifulSoup(markup, self.SOUP_PARSER, parse_only=parse_only,
+                                 from_encoding='utf-8')
+        return BeautifulSoup(markup, self.SOUP_PARSER, parse_only=parse_only)
     
     def _resolve_path(self, ref_path: str) -> Optional[Path]:
         """
@@ -394,39 +785,16 @@ class ContentControlResolver:
         Returns:
             Resolved Path object or None
         """
-        # Remove quotes if present
-        ref_path = ref_path.strip('\'"')
-        
-        # Try as absolute path
-        path = Path(ref_path)
-        if path.is_absolute() and path.exists():
-            return path
-        
-        # Try relative to base path
-        path = self.base_path / ref_path
-        if path.exists():
-            return path
-        
-        # Try common locations
-        common_locations = [
-            'templates',
-            'Common/Content Blocks',
-            'Content Blocks',
-            'Documents',
-            'Samples/templates'
-        ]
-        
-        for location in common_locations:
-            path = self.base_path / location / ref_path
-            if path.exists():
-                return path
-            
-            # Try with .docx extension
-            path_with_ext = path.with_suffix('.docx')
-            if path_with_ext.exists():
-                return path_with_ext
-        
-        return None
+        path = self._path_cache.get(ref_path)
+        if path is None:
+            path = _probe_path(self._base_path_str, self._search_roots, ref_path)
+            if path is None:
+                # Misses are not remembered: the file may be added later
+                return None
+            if len(self._path_cache) >= _PATH_CACHE_SIZE:
+                del self._path_cache[next(iter(self._path_cache))]
+            self._path_cache[ref_path] = path
+        return Path(path)
     
     def _find_content_block_file(self, block_name: str) -> Optional[str]:
         """
@@ -438,35 +806,77 @@ class ContentControlResolver:
         Returns:
             Relative path to the file or None
         """
-        # Search in common content block locations
-        search_dirs = [
-            self.base_path / 'templates' / 'Common' / 'Content Blocks',
-            self.base_path / 'templates' / 'Content Blocks',
-            self.base_path / 'Content Blocks'
-        ]
+        if self._block_index is None:
+            self._block_index = self._build_block_index()
         
-        for search_dir in search_dirs:
-            if search_dir.exists():
-                # Look for files containing the block name
-                for file_path in search_dir.rglob('*.docx'):
-                    if block_name.lower() in file_path.stem.lower():
-                        return str(file_path.relative_to(self.base_path))
+        name = block_name.lower()
+        
+        # An exact name wins; otherwise look for files containing the name
+        if name in self._block_index:
+            return self._block_index[name]
+        for stem, relative_path in self._block_index.items():
+            if name in stem:
+                return relative_path
         
         return None
     
-    def _generate_cache_key(self, ref_type: str, ref_path: str) -> str:
+    def _build_block_index(self) -> Dict[str, str]:
+        """
+        Walk the content block locations once, indexing every DOCX file.
+        
+        Returns:
+            Relative paths keyed by lowercased file stem, in search order
+        """
+        # Search in common content block locations
+        search_dirs = (
+            os.path.join(self._base_path_str, 'templates', 'Common', 'Content Blocks'),
+            os.path.join(self._base_path_str, 'templates', 'Content Blocks'),
+            os.path.join(self._base_path_str, 'Content Blocks')
+        )
+        
+        index = {}
+        for search_dir in search_dirs:
+            for dir_path, _, file_names in os.walk(search_dir):
+                for file_name in file_names:
+                    stem, ext = os.path.splitext(file_name)
+                    if ext == '.docx':
+                        index.setdefault(stem.lower(), os.path.relpath(
+                            os.path.join(dir_path, file_name), self._base_path_str
+                        ))
+        
+        return index
+    
+    def _generate_cache_key(self, ref_type: str, ref_path: str) -> Tuple[str, str]:
         """
         Generate a unique cache key for a reference.
         
+        The cache is an in-process mapping, so the raw tuple is used directly;
+        it hashes in C and cannot collide.
+        
         Args:
             ref_type: Type of reference
             ref_path: Reference path
             
         Returns:
-            Hash-based cache key
+            (ref_type, ref_path) cache key
+        """
+        return (ref_type, ref_path)
+    
+    @staticmethod
+    def _fragment_key(full_path: Path) -> Tuple[str, Path]:
+        """
+        Cache key for the converted fragment of a DOCX file.
+        
+        Keyed by the resolved path, so every reference spelling reaching the
+        file shares the entry; the Path never equals a reference string.
+        
+        Args:
+            full_path: Resolved path of the DOCX file
+            
+        Returns:
+            Cache key tuple
         """
-        key_string = f"{ref_type}:{ref_path}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return ('fragment', full_path)
     
     def get_statistics(self) -> Dict:
         """
@@ -483,7 +893,8 @@ class ContentControlResolver:
         
         return {
             **self.statistics,
-            'cache_size': len(self.cache),
+            # Resolved references only, not the converted fragments
+            'cache_size': sum(1 for key in self.cache if key[0] != 'fragment'),
             'cache_hit_rate': f"{cache_hit_rate:.1f}%",
             'dependency_graph_size': len(self.dependency_graph)
         }
@@ -491,9 +902,28 @@ class ContentControlResolver:
     def clear_cache(self):
         """Clear the resolution cache."""
         self.cache.clear()
+        self._cache_bytes = 0
+        self._conversions.clear()
+        self._block_index = None
+        self._path_cache.clear()
         self.statistics['cache_hits'] = 0
         self.statistics['cache_misses'] = 0
     
+    def close(self):
+        """Shut down the conversion thread pool, dropping pending prefetches."""
+        for conversion in self._conversions.values():
+            conversion.cancel()
+        self._conversions.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def __enter__(self) -> 'ContentControlResolver':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def get_dependency_graph(self) -> Dict[str, List[str]]:
         """
         Get the document dependency graph.
@@ -0,0 +1,77 @@
+"""
+Conversion result cache for the DOCX to HTML Converter
+
+Conversion is deterministic, so results are cached by the SHA-256 of the
+uploaded DOCX. Results are kept in an in-process LRU by default; when
+REDIS_URL is set and the optional redis package is installed they are
+shared through Redis instead (see the with-redis compose profile).
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL = int(os.getenv("CONVERSION_CACHE_TTL", 86400))
+CACHE_SIZE = int(os.getenv("CONVERSION_CACHE_SIZE", 256))
+
+
+class ConversionCache:
+    """Async get/set of conversion results, backed by Redis or memory"""
+
+    def __init__(self, redis_url: Optional[str] = None, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        # key -> (expiry, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._redis = None
+        if redis_url:
+            if aioredis is None:
+                logger.warning("REDIS_URL is set but redis is not installed; using in-memory cache")
+            else:
+                self._redis = aioredis.from_url(redis_url, max_connections=20)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+            except Exception as e:
+                # Cache is best-effort: a Redis outage only costs a reconversion
+                logger.warning(f"Conversion cache unavailable: {e}")
+                return None
+            return json.loads(raw) if raw is not None else None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if expiry < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], expire: int = CACHE_TTL):
+        if self._redis is not None:
+            try:
+                await self._redis.set(key, json.dumps(value, default=str), ex=expire)
+            except Exception as e:
+                logger.warning(f"Conversion cache unavailable: {e}")
+            return
+
+        self._entries[key] = (time.monotonic() + expire, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+conversion_cache = ConversionCache(REDIS_URL)
@@ -0,0 +1,27 @@
+"""
+HTTP cache validation helpers for the DOCX to HTML Converter
+"""
+
+from fastapi import Request
+
+
+def _opaque_tag(etag: str) -> str:
+    """An entity tag without its weakness indicator"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """
+    Whether the client's If-None-Match already names this ETag
+
+    If-None-Match takes a list of tags or "*", and is compared weakly, so a
+    W/ prefix on either side does not prevent a match.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == current for tag in if_none_match.split(","))
@@ -8,16 +8,59 @@ World-class implementation with machine learning readiness.
 """
 
 import re
-import os
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+import hashlib
+from bisect import bisect_right
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 import logging
-from collections import Counter
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
+# lxml parsers keep state while parsing and must not be shared between
+# threads, so each scoring thread gets its own
+_parser_local = threading.local()
+
+
+def _lxml_parser():
+    """The calling thread's lxml HTML parser, created on first use"""
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml_html.HTMLParser(encoding='utf-8')
+    return parser
+
+# Opening <body> tag in the source markup
+_BODY_TAG = re.compile(r'<body[\s>/]', re.IGNORECASE)
+
+# Elements holding code rather than document text (BeautifulSoup's
+# get_text leaves them out too)
+_NON_TEXT_TAGS = ('script', 'style', 'template')
+
+# Letter phrasing, matched against already lowercased content
+_CORRESPONDENCE_RE = re.compile(r'dear\s+\w+|sincerely|regards')
+
+# Markers of unrendered template syntax in the original content
+_TEMPLATE_MARKERS = ('{{', '{%', 'context.')
+
+# Detected categories by (path, content length, content digest), least
+# recently used first; shared by all scorers in the process
+_CATEGORY_CACHE = OrderedDict()
+_CATEGORY_CACHE_SIZE = 4096
+
 
 class DocumentCategory(Enum):
     """Document categories with specific scoring needs"""
@@ -33,6 +76,19 @@ class DocumentCategory(Enum):
     UNKNOWN = "unknown"
 
 
+# Letter grades and the lowest score earning each grade above F
+_GRADE_THRESHOLDS = (6.0, 6.3, 6.7, 7.0, 7.3, 7.7, 8.0, 8.3, 8.7, 9.0, 9.3, 9.7)
+_GRADES = ('F', 'D-', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+')
+
+# Technical score by conversion confidence: the lowest confidence earning
+# each score above 5.0
+_CONFIDENCE_THRESHOLDS = (70, 80, 85, 90, 95)
+_CONFIDENCE_SCORES = (5.0, 6.0, 7.0, 8.0, 9.0, 10.0)
+
+# Scored aspects, in the order of ScoringProfile.weights
+ASPECTS = ('content', 'structure', 'sharedo', 'formatting', 'technical')
+
+
 @dataclass
 class ScoringProfile:
     """Scoring profile for a document category"""
@@ -44,6 +100,56 @@ class ScoringProfile:
     technical_weight: float
     minimum_content_threshold: int  # Minimum characters for content scoring
     requires_sharedo: bool  # Whether Sharedo elements are expected
+    weights: Tuple[float, ...] = field(init=False, repr=False)  # Aspect weights in ASPECTS order
+    
+    def __post_init__(self):
+        self.weights = (
+            self.content_weight,
+            self.structure_weight,
+            self.sharedo_weight,
+            self.formatting_weight,
+            self.technical_weight
+        )
+
+
+def _keyword_scanner(category_keywords: Dict) -> Callable[[str], set]:
+    """
+    Build a function returning the (category, keyword) pairs found in a
+    text, scanning the text once however many keywords there are.
+    
+    Uses a pyahocorasick automaton when installed, otherwise one substring
+    test per keyword.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                automaton.add_word(keyword, (category, keyword))
+        automaton.make_automaton()
+        
+        def scan(text: str) -> set:
+            return {found for _, found in automaton.iter(text)}
+        return scan
+    
+    pairs = tuple(
+        (category, keyword)
+        for category, keywords in category_keywords.items()
+        for keyword in keywords
+    )
+    
+    # Each containment test is CPython's C fastsearch over the string, which
+    # beats a regex alternation that must try every keyword at each position
+    def scan(text: str) -> set:
+        return {pair for pair in pairs if pair[1] in text}
+    return scan
+
+
+class ParsedHTML(NamedTuple):
+    """Converted HTML parsed once and shared by the scorers"""
+    text: str  # Visible text, whitespace-separated
+    tag_counts: Counter  # Element count by tag name
+    attributes: frozenset  # Names of the attributes used on any element
+    has_body: bool  # Whether the markup has its own <body> element
 
 
 class IntelligentScorer:
@@ -128,29 +234,38 @@ class IntelligentScorer:
     
     # Keywords for document categorization
     CATEGORY_KEYWORDS = {
-        DocumentCategory.LEGAL: [
+        DocumentCategory.LEGAL: frozenset({
             'agreement', 'contract', 'legal', 'clause', 'terms', 'conditions',
             'liability', 'indemnity', 'jurisdiction', 'dispute', 'defendant',
             'claimant', 'witness', 'court', 'proceeding'
-        ],
-        DocumentCategory.FINANCIAL: [
+        }),
+        DocumentCategory.FINANCIAL: frozenset({
             'invoice', 'payment', 'cost', 'fee', 'expense', 'budget',
             'financial', 'accounting', 'tax', 'revenue', 'profit'
-        ],
-        DocumentCategory.CORRESPONDENCE: [
+        }),
+        DocumentCategory.CORRESPONDENCE: frozenset({
             'letter', 'dear', 'sincerely', 'regards', 'yours', 'response',
             'inquiry', 'request', 'acknowledge', 'confirm'
-        ],
-        DocumentCategory.FORM: [
+        }),
+        DocumentCategory.FORM: frozenset({
             'form', 'questionnaire', 'application', 'registration',
             'checkbox', 'field', 'fill', 'complete', 'submit'
-        ],
-        DocumentCategory.REPORT: [
+        }),
+        DocumentCategory.REPORT: frozenset({
             'report', 'analysis', 'summary', 'findings', 'conclusion',
             'recommendation', 'executive summary', 'results'
-        ]
+        })
     }
     
+    # Categories in the order keyword matches are checked
+    _KEYWORD_CATEGORIES = tuple(CATEGORY_KEYWORDS)
+    
+    # Profile for categories without one of their own
+    _DEFAULT_PROFILE = SCORING_PROFILES[DocumentCategory.FULL_DOCUMENT]
+    
+    # Finds every category keyword in one pass over the content
+    _scan_keywords = staticmethod(_keyword_scanner(CATEGORY_KEYWORDS))
+    
     def __init__(self):
         """Initialize the intelligent scorer"""
         self.statistics = {
@@ -159,6 +274,7 @@ class IntelligentScorer:
             'average_scores': {},
             'profile_adjustments': 0
         }
+        self._last_parse = None  # (html, ParsedHTML) of the last document
         
     def score_conversion(self, 
                         original_path: str,
@@ -179,28 +295,60 @@ class IntelligentScorer:
         Returns:
             Comprehensive scoring results
         """
+        category, result = self._score_document(
+            original_path, original_content, converted_html,
+            conversion_metadata, structure_analysis
+        )
+        
+        # Update statistics
+        self.statistics['documents_scored'] += 1
+        self.statistics['category_distribution'][category] += 1
+        
+        return result
+    
+    def _score_document(self,
+                        original_path: str,
+                        original_content: str,
+                        converted_html: str,
+                        conversion_metadata: Dict,
+                        structure_analysis: Optional[Dict] = None
+                        ) -> Tuple[DocumentCategory, Dict]:
+        """
+        Score a document conversion without counting it in the statistics.
+        
+        Returns:
+            Tuple of (detected category, scoring results)
+        """
+        # Lowercase and tokenize the original once for all checks
+        original_lower = original_content.lower() if original_content else ""
+        original_tokens = original_lower.split()
+        original_word_set = frozenset(original_tokens)
+        
         # Detect document category
-        category = self._detect_category(original_path, original_content, converted_html)
+        category = self._detect_category(
+            original_path, original_content, converted_html,
+            original_lower, len(original_tokens)
+        )
+        
+        # Parse the converted HTML once for all scorers
+        parsed = self._parse_html(converted_html)
         
         # Get appropriate scoring profile (default to FULL_DOCUMENT if unknown)
-        profile = self.SCORING_PROFILES.get(
-            category, 
-            self.SCORING_PROFILES[DocumentCategory.FULL_DOCUMENT]
-        )
+        profile = self.SCORING_PROFILES.get(category, self._DEFAULT_PROFILE)
         
         # Perform category-specific scoring
         scores = {
             'content': self._score_content(
-                original_content, converted_html, profile
+                original_content, original_word_set, converted_html, parsed, profile
             ),
             'structure': self._score_structure(
-                converted_html, structure_analysis, profile
+                parsed, structure_analysis, profile
             ),
             'sharedo': self._score_sharedo(
                 converted_html, conversion_metadata, profile
             ),
             'formatting': self._score_formatting(
-                converted_html, profile
+                parsed, profile
             ),
             'technical': self._score_technical(
                 conversion_metadata, profile
@@ -209,8 +357,8 @@ class IntelligentScorer:
         
         # Calculate weighted total
         weighted_total = sum(
-            scores[aspect] * getattr(profile, f"{aspect}_weight")
-            for aspect in scores
+            scores[aspect] * weight
+            for aspect, weight in zip(ASPECTS, profile.weights)
         )
         
         # Apply adjustments
@@ -218,14 +366,10 @@ class IntelligentScorer:
             weighted_total, category, original_content, scores
         )
         
-        # Update statistics
-        self.statistics['documents_scored'] += 1
-        self.statistics['category_distribution'][category] += 1
-        
         # Determine grade
         grade = self._calculate_grade(adjusted_score)
         
-        return {
+        return category, {
             'category': category.value,
             'profile_used': profile.category.value,
             'raw_scores': scores,
@@ -236,20 +380,159 @@ class IntelligentScorer:
             'recommendations': self._generate_recommendations(scores, category)
         }
     
-    def _detect_category(self, path: str, original: str, html: str) -> DocumentCategory:
+    def score_conversions(self, docs: List[Dict], n_workers: int = 1) -> List[Dict]:
+        """
+        Score a batch of document conversions.
+        
+        Args:
+            docs: One dict per document holding score_conversion's arguments
+                by name (original_path, original_content, converted_html,
+                conversion_metadata and optionally structure_analysis)
+            n_workers: Number of worker processes; HTML parsing is CPU-bound
+                and holds the GIL, so documents are scored in parallel
+                processes rather than threads
+            
+        Returns:
+            Scoring results, in the order of docs
+        """
+        if n_workers <= 1 or len(docs) < 2:
+            score_document = self._score_document
+            scored = [score_document(**doc) for doc in docs]
+        else:
+            chunksize = max(1, len(docs) // (4 * n_workers))
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                scored = list(executor.map(_score_one_worker, docs, chunksize=chunksize))
+            
+            # Fold in the adjustments the workers made
+            self.statistics['profile_adjustments'] += sum(
+                adjustments for _, _, adjustments in scored
+            )
+        
+        # Update statistics once for the whole batch
+        self.statistics['documents_scored'] += len(scored)
+        self.statistics['category_distribution'].update(
+            [entry[0] for entry in scored]
+        )
+        
+        return [entry[1] for entry in scored]
+    
+    def _parse_html(self, html: str) -> ParsedHTML:
+        """
+        Parse converted HTML once for all scorers.
+        
+        With lxml installed the document is parsed and walked by lxml
+        directly and its text gathered by libxml2; otherwise, or when lxml
+        finds no document in it, BeautifulSoup's html.parser is used.
+        
+        The last result is kept, so scoring the same HTML object again
+        does not reparse it.
+        
+        Args:
+            html: Converted HTML
+            
+        Returns:
+            Text, tag counts and attribute names of the document
+        """
+        if self._last_parse is not None and self._last_parse[0] is html:
+            return self._last_parse[1]
+        
+        # One walk over the elements gathers everything the structure and
+        # formatting scorers check for
+        tag_counts = Counter()
+        attributes = set()
+        
+        root = None
+        if lxml_html is not None and html.strip():
+            try:
+                root = lxml_html.document_fromstring(html.encode('utf-8'), parser=_lxml_parser())
+            except etree.ParserError:
+                # Markup with no elements at all (only a comment or a
+                # doctype) is "empty" to lxml; html.parser handles it below
+                root = None
+        
+        if root is not None:
+            for element in root.iter(etree.Element):
+                tag_counts[element.tag] += 1
+                if element.attrib:
+                    attributes.update(element.attrib.keys())
+            
+            etree.strip_elements(root, *_NON_TEXT_TAGS, with_tail=False)
+            text = ' '.join(root.itertext())
+        else:
+            soup = BeautifulSoup(html, 'html.parser')
+            for tag in soup.find_all(True):
+                tag_counts[tag.name] += 1
+                if tag.attrs:
+                    attributes.update(tag.attrs)
+            
+            text = soup.get_text(separator=' ', strip=True)
+        
+        parsed = ParsedHTML(
+            text=text,
+            tag_counts=tag_counts,
+            attributes=frozenset(attributes),
+            # lxml always adds html/body around the markup, so a body
+            # element in the tree does not mean the converter wrote one
+            has_body=bool(html) and _BODY_TAG.search(html) is not None
+        )
+        
+        self._last_parse = (html, parsed)
+        return parsed
+    
+    def _detect_category(self, path: str, original: str, html: str,
+                         content_lower: str, word_count: int) -> DocumentCategory:
         """
         Intelligently detect document category.
         
+        Detection depends only on the path and original content, so results
+        are memoized on the path and a digest of the content: re-scoring a
+        document (e.g. comparing converters on one corpus) skips it.
+        
         Args:
             path: Document path
             original: Original content
             html: Converted HTML
+            content_lower: Original content, lowercased
+            word_count: Number of words in the original content
+            
+        Returns:
+            Detected document category
+        """
+        original = original or ""
+        key = (
+            path,
+            len(original),
+            hashlib.blake2b(original.encode('utf-8', 'ignore'), digest_size=8).digest()
+        )
+        
+        category = _CATEGORY_CACHE.get(key)
+        if category is not None:
+            _CATEGORY_CACHE.move_to_end(key)
+            return category
+        
+        category = self._detect_category_impl(path, original, content_lower, word_count)
+        
+        _CATEGORY_CACHE[key] = category
+        if len(_CATEGORY_CACHE) > _CATEGORY_CACHE_SIZE:
+            _CATEGORY_CACHE.popitem(last=False)
+        
+        return category
+    
+    def _detect_category_impl(self, path: str, original: str,
+                              content_lower: str, word_count: int) -> DocumentCategory:
+        """
+        Detect document category from its path and content (uncached).
+        
+        Args:
+            path: Document path
+            original: Original content
+            content_lower: Original content, lowercased
+            word_count: Number of words in the original content
             
         Returns:
             Detected document category
         """
         path_lower = path.lower()
-        content_lower = original.lower() if original else ""
         
         # Check path-based patterns
         if 'content block' in path_lower or 'contentblock' in path_lower:
@@ -259,24 +542,26 @@ class IntelligentScorer:
             return DocumentCategory.TEMPLATE
         
         # Check for minimal content documents
-        word_count = len(original.split()) if original else 0
         if word_count < 10:
             # Check if it's a footer or header
             if any(term in path_lower for term in ['footer', 'header', 'blank']):
                 return DocumentCategory.MINIMAL
         
         # Check content-based patterns
-        for category, keywords in self.CATEGORY_KEYWORDS.items():
-            keyword_count = sum(1 for keyword in keywords if keyword in content_lower)
-            if keyword_count >= 3:  # At least 3 matching keywords
-                return category
+        if content_lower:
+            keyword_counts = Counter(
+                category for category, _ in self._scan_keywords(content_lower)
+            )
+            for category in self._KEYWORD_CATEGORIES:
+                if keyword_counts[category] >= 3:  # At least 3 matching keywords
+                    return category
         
         # Check for correspondence patterns
-        if re.search(r'dear\s+\w+|sincerely|regards', content_lower, re.IGNORECASE):
+        if _CORRESPONDENCE_RE.search(content_lower):
             return DocumentCategory.CORRESPONDENCE
         
         # Check for template indicators
-        if '{{' in original or '{%' in original or 'context.' in original:
+        if any(marker in original for marker in _TEMPLATE_MARKERS):
             return DocumentCategory.TEMPLATE
         
         # Default categorization based on size and structure
@@ -289,13 +574,16 @@ class IntelligentScorer:
         else:
             return DocumentCategory.UNKNOWN  # Empty document
     
-    def _score_content(self, original: str, html: str, profile: ScoringProfile) -> float:
+    def _score_content(self, original: str, original_words: frozenset, html: str,
+                       parsed: ParsedHTML, profile: ScoringProfile) -> float:
         """
         Score content preservation with profile awareness.
         
         Args:
             original: Original content
+            original_words: Distinct lowercased words of the original
             html: Converted HTML
+            parsed: Parsed converted HTML
             profile: Scoring profile
             
         Returns:
@@ -308,24 +596,22 @@ class IntelligentScorer:
                 return 8.0  # Good score for preserving minimal content
             return 5.0
         
-        # Extract text from HTML for comparison
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
-        converted_text = soup.get_text(separator=' ', strip=True)
+        # Text from HTML for comparison
+        converted_text = parsed.text
         
         # Calculate content similarity
-        original_words = set(original.lower().split())
         converted_words = set(converted_text.lower().split())
         
         if not original_words:
             return 10.0 if not converted_words else 5.0
         
-        # Calculate Jaccard similarity
-        intersection = original_words & converted_words
-        union = original_words | converted_words
+        # Calculate Jaccard similarity; the union's size follows from the
+        # intersection's, so the union set itself is never built
+        intersection = len(original_words.intersection(converted_words))
+        union = len(original_words) + len(converted_words) - intersection
         
         if union:
-            similarity = len(intersection) / len(union)
+            similarity = intersection / union
         else:
             similarity = 1.0
         
@@ -342,34 +628,33 @@ class IntelligentScorer:
         
         return base_score
     
-    def _score_structure(self, html: str, analysis: Optional[Dict], 
+    def _score_structure(self, parsed: ParsedHTML, analysis: Optional[Dict], 
                         profile: ScoringProfile) -> float:
         """
         Score structural preservation with profile awareness.
         
         Args:
-            html: Converted HTML
+            parsed: Parsed converted HTML
             analysis: Structure analysis results
             profile: Scoring profile
             
         Returns:
             Structure score (0-10)
         """
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
+        tags = parsed.tag_counts
         
         score = 10.0
         
         # Check basic structure elements
-        has_paragraphs = bool(soup.find_all('p'))
-        has_headings = bool(soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
-        has_tables = bool(soup.find_all('table'))
-        has_lists = bool(soup.find_all(['ul', 'ol']))
+        has_paragraphs = tags['p'] > 0
+        has_headings = any(tags[h] for h in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+        has_tables = tags['table'] > 0
+        has_lists = tags['ul'] > 0 or tags['ol'] > 0
         
         # Adjust based on what's expected for the category
         if profile.category == DocumentCategory.MINIMAL:
             # Minimal documents may not need complex structure
-            if soup.body or soup.find_all(['div', 'p', 'span']):
+            if parsed.has_body or tags['div'] or tags['p'] or tags['span']:
                 return 9.0
             return 7.0
         
@@ -379,7 +664,7 @@ class IntelligentScorer:
                 score -= 2.0
             
             # Check for data attributes indicating structure
-            if soup.find_all(attrs={'data-section': True}):
+            if 'data-section' in parsed.attributes:
                 score = min(10.0, score + 1.0)
         
         if profile.category == DocumentCategory.LEGAL:
@@ -462,30 +747,29 @@ class IntelligentScorer:
         else:
             return 4.0
     
-    def _score_formatting(self, html: str, profile: ScoringProfile) -> float:
+    def _score_formatting(self, parsed: ParsedHTML, profile: ScoringProfile) -> float:
         """
         Score formatting preservation.
         
         Args:
-            html: Converted HTML
+            parsed: Parsed converted HTML
             profile: Scoring profile
             
         Returns:
             Formatting score (0-10)
         """
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
+        tags = parsed.tag_counts
         
         score = 10.0
         
         # Check for formatting elements
-        has_styles = bool(soup.find('style') or soup.find_all(style=True))
-        has_bold = bool(soup.find_all(['b', 'strong']))
-        has_italic = bool(soup.find_all(['i', 'em']))
-        has_underline = bool(soup.find_all('u'))
+        has_styles = tags['style'] > 0 or 'style' in parsed.attributes
+        has_bold = tags['b'] > 0 or tags['strong'] > 0
+        has_italic = tags['i'] > 0 or tags['em'] > 0
+        has_underline = tags['u'] > 0
         
         # Check for CSS classes
-        has_classes = bool(soup.find_all(class_=True))
+        has_classes = 'class' in parsed.attributes
         
         # Minimal documents don't need rich formatting
         if profile.category == DocumentCategory.MINIMAL:
@@ -517,24 +801,11 @@ class IntelligentScorer:
         processing_time = metadata.get('processing_time', 0)
         
         # Base score on confidence
-        if confidence >= 95:
-            score = 10.0
-        elif confidence >= 90:
-            score = 9.0
-        elif confidence >= 85:
-            score = 8.0
-        elif confidence >= 80:
-            score = 7.0
-        elif confidence >= 70:
-            score = 6.0
-        else:
-            score = 5.0
+        score = _CONFIDENCE_SCORES[bisect_right(_CONFIDENCE_THRESHOLDS, confidence)]
         
-        # Adjust for processing time (penalize slow conversions)
-        if processing_time > 1.0:  # More than 1 second
-            score -= 0.5
-        elif processing_time > 2.0:  # More than 2 seconds
-            score -= 1.0
+        # Adjust for processing time (penalize slow conversions): 0.5 for
+        # more than 1 second, 1.0 for more than 2 seconds
+        score -= 0.5 * (processing_time > 1.0) + 0.5 * (processing_time > 2.0)
         
         return max(0.0, min(10.0, score))
     
@@ -587,19 +858,7 @@ class IntelligentScorer:
         Returns:
             Letter grade
         """
-        if score >= 9.7: return "A+"
-        elif score >= 9.3: return "A"
-        elif score >= 9.0: return "A-"
-        elif score >= 8.7: return "B+"
-        elif score >= 8.3: return "B"
-        elif score >= 8.0: return "B-"
-        elif score >= 7.7: return "C+"
-        elif score >= 7.3: return "C"
-        elif score >= 7.0: return "C-"
-        elif score >= 6.7: return "D+"
-        elif score >= 6.3: return "D"
-        elif score >= 6.0: return "D-"
-        else: return "F"
+        return _GRADES[bisect_right(_GRADE_THRESHOLDS, score)]
     
     def _generate_scoring_details(self, scores: Dict, profile: ScoringProfile) -> Dict:
         """
@@ -614,8 +873,8 @@ class IntelligentScorer:
         """
         details = {}
         
-        for aspect, score in scores.items():
-            weight = getattr(profile, f"{aspect}_weight")
+        for aspect, weight in zip(ASPECTS, profile.weights):
+            score = scores[aspect]
             details[aspect] = {
                 'raw_score': round(score, 2),
                 'weight': weight,
@@ -693,4 +952,25 @@ class IntelligentScorer:
                 self.statistics['category_distribution'].most_common(1)[0][0].value
                 if self.statistics['category_distribution'] else 'none'
             )
-        }
\ No newline at end of file
+        }
+
+
+# Scorer of the current worker process (see score_conversions)
+_worker_scorer = None
+
+
+def _score_one_worker(doc: Dict) -> Tuple[DocumentCategory, Dict, int]:
+    """
+    Score one document in a worker process.
+    
+    Returns:
+        Tuple of (detected category, scoring results, profile adjustments
+        made)
+    """
+    global _worker_scorer
+    if _worker_scorer is None:
+        _worker_scorer = IntelligentScorer()
+    
+    adjustments = _worker_scorer.statistics['profile_adjustments']
+    category, result = _worker_scorer._score_document(**doc)
+    return category, result, _worker_scorer.statistics['profile_adjustments'] - adjustments
@@ -4,32 +4,46 @@ Enterprise-grade conversion for Sharedo email templates
 Powered by Alterspective Legal Technology
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Request, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, ORJSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import os
 import sys
 import time
 import json
+import io
 import tempfile
 import shutil
 from datetime import datetime
 from pathlib import Path
 import uuid
+import sqlite3
+import hashlib
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+from collections import Counter, OrderedDict, deque
+
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 from sharedo_batch_converter import SharedoBatchConverter
 
 # Import changelog route
 from .changelog_route import router as changelog_router
+from .conversion_cache import conversion_cache
+from .http_cache import not_modified
 
 # Configure logging
 logging.basicConfig(
@@ -51,7 +65,8 @@ app = FastAPI(
     license_info={
         "name": "Proprietary - Alterspective.io",
         "url": "https://alterspective.com.au/license",
-    }
+    },
+    default_response_class=ORJSONResponse if orjson else JSONResponse
 )
 
 # Configure CORS
@@ -61,31 +76,109 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Conversion-Id", "X-Conversion-Status", "X-Confidence-Score"],
 )
 
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that passes the given paths through uncompressed"""
+
+    def __init__(self, app, excluded_paths: Tuple[str, ...] = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress responses large enough to benefit (converted HTML, reports). The
+# sample DOCX is already a ZIP archive, so gzip would only cost CPU.
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, excluded_paths=("/api/v1/sample",))
+
 # Setup templates
 templates = Jinja2Templates(directory="app/templates")
 
+# index.html has no per-request content, so it is rendered once on first use
+_landing_html: Optional[str] = None
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Include changelog router
 app.include_router(changelog_router)
 
-# Thread pool for async conversions
-executor = ThreadPoolExecutor(max_workers=4)
+# Upload limits: largest accepted DOCX, and the chunk size it is streamed in
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# DOCX files are ZIP archives, which start with a local file header
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Maximum number of conversions running at once across all requests
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", os.cpu_count() or 4))
+_conversion_slots: Optional[asyncio.Semaphore] = None
+
+def get_conversion_slots() -> asyncio.Semaphore:
+    """Semaphore capping concurrent conversions, created on the running loop"""
+    global _conversion_slots
+    if _conversion_slots is None:
+        _conversion_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _conversion_slots
+
+# Threads backing asyncio.to_thread, sized to the CPUs so blocking
+# conversions don't oversubscribe cores
+CONVERT_THREADS = int(os.getenv("CONVERT_THREADS", os.cpu_count() or 4))
+
+@app.on_event("startup")
+async def configure_executor():
+    """Install a bounded default executor on the serving event loop"""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=CONVERT_THREADS, thread_name_prefix="convert")
+    )
+
+# Writes log records for the root logger's handlers from a background thread
+_log_listener: Optional[QueueListener] = None
+
+@app.on_event("startup")
+async def start_log_listener():
+    """Route logging through a queue so log calls never block the event loop"""
+    global _log_listener
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    _log_listener.start()
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    """Flush queued records and give the handlers back to the root logger"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        logging.getLogger().handlers = list(_log_listener.handlers)
+        _log_listener = None
 
 # In-memory storage for metrics (in production, use Redis or database)
 class MetricsStore:
     def __init__(self):
-        self.conversions = []
         self.total_conversions = 0
         self.successful_conversions = 0
         self.failed_conversions = 0
         self.total_processing_time = 0
-        self.conversion_history = []
+        # Last 100 conversions; the deque drops the oldest on append
+        self.conversion_history = deque(maxlen=100)
+        # conversion_id -> entry for everything currently in the history
+        self.conversion_index: Dict[str, Dict[str, Any]] = {}
+        # Encoded get_metrics() payload and its ETag, rebuilt after the
+        # next conversion
+        self._metrics_body: Optional[Tuple[bytes, str]] = None
         
     def add_conversion(self, result: Dict[str, Any]):
+        # Only called from the event loop and never awaits, so concurrent
+        # requests can't interleave here; keep it that way rather than
+        # calling it from conversion threads
         self.total_conversions += 1
         if result['status'] == 'success':
             self.successful_conversions += 1
@@ -94,10 +187,15 @@ class MetricsStore:
         
         self.total_processing_time += result.get('processing_time', 0)
         
-        # Keep last 100 conversions in history
+        # Unindex the entry the append is about to evict
+        if len(self.conversion_history) == self.conversion_history.maxlen:
+            self.conversion_index.pop(self.conversion_history[0]['conversion_id'], None)
         self.conversion_history.append(result)
-        if len(self.conversion_history) > 100:
-            self.conversion_history.pop(0)
+        self.conversion_index[result['conversion_id']] = result
+        self._metrics_body = None
+    
+    async def get_conversion(self, conversion_id: str) -> Optional[Dict[str, Any]]:
+        return self.conversion_index.get(conversion_id)
     
     def get_metrics(self):
         avg_time = self.total_processing_time / self.total_conversions if self.total_conversions > 0 else 0
@@ -109,10 +207,163 @@ class MetricsStore:
             "failed_conversions": self.failed_conversions,
             "success_rate": round(success_rate, 2),
             "average_processing_time": round(avg_time, 2),
-            "recent_conversions": self.conversion_history[-10:]  # Last 10 conversions
+            "recent_conversions": list(self.conversion_history)[-10:]  # Last 10 conversions
+        }
+    
+    async def get_metrics_body(self) -> Tuple[bytes, str]:
+        """get_metrics() encoded as JSON with its ETag, cached until metrics change"""
+        if self._metrics_body is None:
+            self._metrics_body = encode_metrics(self.get_metrics())
+        return self._metrics_body
+
+# Metrics in a SQLite database shared by every worker and kept across restarts
+class SQLiteMetricsStore:
+    # How long one worker reuses its encoded payload; other workers may have
+    # recorded conversions since, so it can't be invalidated on write alone
+    METRICS_TTL = 1.0
+    
+    def __init__(self, path: str, retention: int = 10000):
+        # Every query runs on this one thread, so a locked database (up to
+        # busy_timeout) stalls metrics, never the event loop, and the
+        # connection is never shared between threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-db")
+        self.retention = retention
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        # Set first: switching to WAL and creating the schema also need the
+        # lock another worker may be holding
+        self.db.execute("PRAGMA busy_timeout=5000")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS conversions ("
+            "conversion_id TEXT PRIMARY KEY, ts REAL NOT NULL, status TEXT NOT NULL, "
+            "processing_time REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS conversions_ts ON conversions (ts)")
+        # Running totals over every conversion ever recorded, so metrics
+        # don't re-aggregate the table; seeded from databases that predate it
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS conversion_totals ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL, "
+            "successful INTEGER NOT NULL, processing_time REAL NOT NULL)"
+        )
+        self.db.execute(
+            "INSERT OR IGNORE INTO conversion_totals SELECT 0, COUNT(*), "
+            "COALESCE(SUM(status = 'success'), 0), COALESCE(SUM(processing_time), 0) "
+            "FROM conversions"
+        )
+        self._metrics_body: Optional[Tuple[bytes, str]] = None
+        self._metrics_time = 0.0
+    
+    def add_conversion(self, result: Dict[str, Any]):
+        # Queued for the database thread; the caller doesn't wait for the write
+        row = (
+            result['conversion_id'], time.time(), result['status'],
+            result.get('processing_time', 0), encode_json(result).decode("utf-8")
+        )
+        self._executor.submit(self._insert, row).add_done_callback(self._log_write_error)
+        self._metrics_body = None
+    
+    def _insert(self, row: Tuple[Any, ...]):
+        """Record a conversion, update the totals and trim old rows (database thread)"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.db.execute("INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?)", row)
+            self.db.execute(
+                "UPDATE conversion_totals SET total = total + 1, "
+                "successful = successful + ?, processing_time = processing_time + ? WHERE id = 0",
+                (row[2] == 'success', row[3])
+            )
+            # Only the newest `retention` conversions stay available as reports
+            self.db.execute(
+                "DELETE FROM conversions WHERE ts < "
+                "(SELECT ts FROM conversions ORDER BY ts DESC LIMIT 1 OFFSET ?)",
+                (self.retention - 1,)
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+    
+    @staticmethod
+    def _log_write_error(future):
+        if future.exception() is not None:
+            logger.error(f"Failed to record conversion metrics: {future.exception()}")
+    
+    async def _run(self, fn, *args):
+        """Run a query function on the database thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+    
+    async def get_conversion(self, conversion_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._select_conversion, conversion_id)
+    
+    def _select_conversion(self, conversion_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(
+            "SELECT data FROM conversions WHERE conversion_id = ?", (conversion_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_metrics(self):
+        """Current metrics (blocking; the async paths run it on the database thread)"""
+        total, successful, total_time = self.db.execute(
+            "SELECT total, successful, processing_time FROM conversion_totals WHERE id = 0"
+        ).fetchone()
+        recent = self.db.execute(
+            "SELECT data FROM conversions ORDER BY ts DESC LIMIT 10"
+        ).fetchall()
+        avg_time = total_time / total if total > 0 else 0
+        success_rate = (successful / total * 100) if total > 0 else 0
+        
+        return {
+            "total_conversions": total,
+            "successful_conversions": successful,
+            "failed_conversions": total - successful,
+            "success_rate": round(success_rate, 2),
+            "average_processing_time": round(avg_time, 2),
+            "recent_conversions": [json.loads(row[0]) for row in reversed(recent)]
         }
+    
+    async def get_metrics_body(self) -> Tuple[bytes, str]:
+        """get_metrics() encoded as JSON with its ETag, cached for METRICS_TTL"""
+        now = time.monotonic()
+        if self._metrics_body is None or now - self._metrics_time >= self.METRICS_TTL:
+            self._metrics_body = encode_metrics(await self._run(self.get_metrics))
+            self._metrics_time = now
+        return self._metrics_body
+    
+    def close(self):
+        """Finish queued writes and close the database"""
+        self._executor.shutdown(wait=True)
+        self.db.close()
+
+def encode_metrics(metrics: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Encode a metrics payload, returning it with its ETag"""
+    # Validated and serialized through MetricsResponse, as a response_model
+    # would be; this only runs when the cached encoding is refreshed
+    body = encode_json(MetricsResponse.model_validate(metrics).model_dump(mode="json"))
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def encode_json(content: Any) -> bytes:
+    """Encode like the app's default response class"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+# Set METRICS_DB to aggregate metrics across workers and restarts; reports
+# are kept for the newest METRICS_DB_RETENTION conversions
+METRICS_DB = os.getenv("METRICS_DB")
+METRICS_DB_RETENTION = int(os.getenv("METRICS_DB_RETENTION", 10000))
+metrics_store = (
+    SQLiteMetricsStore(METRICS_DB, retention=METRICS_DB_RETENTION) if METRICS_DB else MetricsStore()
+)
 
-metrics_store = MetricsStore()
+@app.on_event("shutdown")
+async def close_metrics_store():
+    """Flush queued metrics writes to the database"""
+    if isinstance(metrics_store, SQLiteMetricsStore):
+        metrics_store.close()
 
 # Response models
 class ConversionResponse(BaseModel):
@@ -149,7 +400,10 @@ app_start_time = time.time()
 @app.get("/", response_class=HTMLResponse)
 async def landing_page(request: Request):
     """Serve the landing page"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    global _landing_html
+    if _landing_html is None:
+        _landing_html = templates.get_template("index.html").render({"request": request})
+    return HTMLResponse(_landing_html)
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
@@ -162,26 +416,34 @@ async def health_check():
         timestamp=datetime.now().isoformat()
     )
 
-@app.get("/metrics", response_model=MetricsResponse)
-async def get_metrics():
+@app.get("/metrics", responses={200: {"model": MetricsResponse}})
+async def get_metrics(request: Request):
     """Get service metrics"""
-    return metrics_store.get_metrics()
+    # Pollers hit this far more often than conversions happen, so serve the
+    # cached encoding instead of re-validating and re-encoding each time
+    body, etag = await metrics_store.get_metrics_body()
+    headers = {"Cache-Control": "max-age=1", "ETag": etag}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
-@app.post("/api/v1/convert", response_model=ConversionResponse)
-async def convert_docx(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(..., description="DOCX file to convert")
-):
+# Shared by every request: single-document conversion keeps no per-call
+# state on the instance, and process_bytes never touches these folders
+converter = SharedoBatchConverter(
+    input_folder=tempfile.gettempdir(),
+    output_folder=tempfile.gettempdir()
+)
+
+def run_conversion(filename: str, data: bytes) -> Tuple[Dict[str, Any], Optional[str]]:
     """
-    Convert a DOCX file to Sharedo HTML template
+    Convert an uploaded DOCX in memory (blocking)
     
-    - **file**: DOCX file to convert (required)
-    
-    Returns converted HTML with confidence score and any issues/warnings
+    Returns the converter's file report and the generated HTML, if any
     """
-    start_time = time.time()
-    conversion_id = str(uuid.uuid4())
-    
+    return converter.process_bytes(filename, data)
+
+async def read_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """Validate and read an uploaded DOCX, returning its bytes and SHA-256"""
     # Validate file type
     if not file.filename.endswith('.docx'):
         raise HTTPException(
@@ -189,75 +451,102 @@ async def convert_docx(
             detail="Invalid file type. Only .docx files are supported."
         )
     
-    # Check file size (max 10MB)
+    # Read the upload in chunks, enforcing the size limit (max 10MB) as it
+    # arrives; the DOCX is converted straight from this buffer
+    buffer = io.BytesIO()
     file_size = 0
-    contents = await file.read()
-    file_size = len(contents)
-    
-    if file_size > 10 * 1024 * 1024:  # 10MB
+    digest = hashlib.sha256()
+    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    # Reject anything that isn't a ZIP on the first chunk
+    if not chunk.startswith(ZIP_MAGIC):
         raise HTTPException(
             status_code=400,
-            detail="File size exceeds 10MB limit."
+            detail="Not a valid DOCX (ZIP) file."
         )
+    while chunk:
+        file_size += len(chunk)
+        if file_size > MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail="File size exceeds 10MB limit."
+            )
+        digest.update(chunk)
+        buffer.write(chunk)
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
     
-    # Reset file pointer
-    await file.seek(0)
-    
+    return buffer.getvalue(), digest.hexdigest()
+
+# Cache key -> task converting that upload, while it runs
+_inflight: Dict[str, "asyncio.Task"] = {}
+
+async def convert_and_cache(
+    cache_key: str, filename: str, data: bytes
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Convert off the event loop within the concurrency cap, caching successes"""
+    async with get_conversion_slots():
+        file_report, html_content = await asyncio.to_thread(
+            run_conversion, filename, data
+        )
+    if file_report['status'] == 'success':
+        await conversion_cache.set(
+            cache_key, {"html": html_content, "report": file_report}
+        )
+    return file_report, html_content
+
+async def convert_document(
+    conversion_id: str, filename: str, data: bytes, digest: str, start_time: float
+) -> ConversionResponse:
+    """Convert and record one validated DOCX upload"""
     try:
-        # Create temporary directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded file
-            temp_file_path = Path(temp_dir) / file.filename
-            with open(temp_file_path, 'wb') as temp_file:
-                temp_file.write(contents)
-            
-            # Create converter instance
-            converter = SharedoBatchConverter(
-                input_folder=temp_dir,
-                output_folder=temp_dir
-            )
-            
-            # Process single document
-            logger.info(f"Processing conversion {conversion_id} for file: {file.filename}")
-            file_report = converter.process_single_document(temp_file_path)
-            
-            # Read generated HTML if successful
-            html_content = None
-            if file_report['status'] == 'success':
-                html_file = Path(temp_dir) / f"{temp_file_path.stem}.html"
-                if html_file.exists():
-                    html_content = html_file.read_text(encoding='utf-8')
-            
-            # Calculate processing time
-            processing_time = time.time() - start_time
-            
-            # Prepare response
-            response = ConversionResponse(
-                conversion_id=conversion_id,
-                status=file_report['status'],
-                message=f"Conversion {'successful' if file_report['status'] == 'success' else 'failed'}",
-                confidence_score=file_report.get('confidence_score'),
-                html_content=html_content,
-                issues=file_report.get('issues', []),
-                warnings=file_report.get('warnings', []),
-                processing_time=round(processing_time, 2),
-                sharedo_elements=file_report.get('sharedo_elements', {})
-            )
-            
-            # Update metrics
-            metrics_data = {
-                'conversion_id': conversion_id,
-                'filename': file.filename,
-                'status': file_report['status'],
-                'confidence_score': file_report.get('confidence_score'),
-                'processing_time': round(processing_time, 2),
-                'timestamp': datetime.now().isoformat()
-            }
-            metrics_store.add_conversion(metrics_data)
-            
-            logger.info(f"Conversion {conversion_id} completed with status: {file_report['status']}")
-            
-            return response
+        logger.info(f"Processing conversion {conversion_id} for file: {filename}")
+        # The HTML header carries the file name, so it is part of the key
+        cache_key = f"conv:{digest}:{filename}"
+        cached = await conversion_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Conversion {conversion_id} served from cache")
+            file_report, html_content = cached['report'], cached['html']
+        else:
+            # Identical uploads arriving together share one conversion
+            task = _inflight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(convert_and_cache(cache_key, filename, data))
+                _inflight[cache_key] = task
+                task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+            else:
+                logger.info(f"Conversion {conversion_id} joined an identical conversion in progress")
+            # Shielded so one client disconnecting doesn't cancel the others
+            file_report, html_content = await asyncio.shield(task)
+        
+        # Calculate processing time
+        processing_time = time.time() - start_time
+        
+        # Prepare response
+        response = ConversionResponse(
+            conversion_id=conversion_id,
+            status=file_report['status'],
+            message=f"Conversion {'successful' if file_report['status'] == 'success' else 'failed'}",
+            confidence_score=file_report.get('confidence_score'),
+            html_content=html_content,
+            issues=file_report.get('issues', []),
+            warnings=file_report.get('warnings', []),
+            processing_time=round(processing_time, 2),
+            sharedo_elements=file_report.get('sharedo_elements', {})
+        )
+        
+        # Update metrics
+        metrics_data = {
+            'conversion_id': conversion_id,
+            'filename': filename,
+            'status': file_report['status'],
+            'confidence_score': file_report.get('confidence_score'),
+            'processing_time': round(processing_time, 2),
+            'timestamp': datetime.now().isoformat()
+        }
+        metrics_store.add_conversion(metrics_data)
+        
+        logger.info(f"Conversion {conversion_id} completed with status: {file_report['status']}")
+        
+        return response
             
     except Exception as e:
         logger.error(f"Error processing conversion {conversion_id}: {str(e)}")
@@ -265,7 +554,7 @@ async def convert_docx(
         # Update metrics for failure
         metrics_data = {
             'conversion_id': conversion_id,
-            'filename': file.filename,
+            'filename': filename,
             'status': 'failed',
             'error': str(e),
             'processing_time': round(time.time() - start_time, 2),
@@ -278,6 +567,101 @@ async def convert_docx(
             detail=f"Conversion failed: {str(e)}"
         )
 
+async def convert_upload(file: UploadFile) -> ConversionResponse:
+    """Validate, convert and record one uploaded DOCX file"""
+    start_time = time.time()
+    conversion_id = str(uuid.uuid4())
+    data, digest = await read_upload(file)
+    return await convert_document(conversion_id, file.filename, data, digest, start_time)
+
+def media_quality(accept: str, media_type: str) -> float:
+    """
+    The q-value an Accept header gives a media type
+    
+    The most specific matching range decides (type/subtype, then type/*,
+    then */*); a missing header accepts everything.
+    """
+    if not accept.strip():
+        return 1.0
+    main_type = media_type.split("/", 1)[0]
+    candidates = {media_type: 3, f"{main_type}/*": 2, "*/*": 1}
+    best_rank, quality = 0, 0.0
+    for media_range in accept.split(","):
+        range_type, *params = (part.strip() for part in media_range.split(";"))
+        rank = candidates.get(range_type.lower(), 0)
+        if rank <= best_rank:
+            continue
+        best_rank, quality = rank, 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+    return quality
+
+
+def prefers_html(request: Request) -> bool:
+    """Whether the client ranks text/html above JSON in its Accept header"""
+    accept = request.headers.get("accept", "")
+    return media_quality(accept, "text/html") > media_quality(accept, "application/json")
+
+
+@app.post("/api/v1/convert", response_model=ConversionResponse)
+async def convert_docx(
+    request: Request,
+    file: UploadFile = File(..., description="DOCX file to convert")
+):
+    """
+    Convert a DOCX file to Sharedo HTML template
+    
+    - **file**: DOCX file to convert (required)
+    
+    Returns converted HTML with confidence score and any issues/warnings.
+    Clients whose `Accept` header ranks `text/html` above `application/json`
+    get the HTML itself as the body of a successful conversion, with the
+    conversion details in `X-` headers.
+    """
+    result = await convert_upload(file)
+    
+    if result.html_content is not None and prefers_html(request):
+        headers = {
+            "X-Conversion-Id": result.conversion_id,
+            "X-Conversion-Status": result.status,
+        }
+        # Left out, rather than sent as "None", when no score was computed
+        if result.confidence_score is not None:
+            headers["X-Confidence-Score"] = str(result.confidence_score)
+        return HTMLResponse(result.html_content, headers=headers)
+    
+    return result
+
+async def convert_batch_file(file: UploadFile) -> Dict[str, Any]:
+    """Convert one file of a batch, reporting failures in the result"""
+    if not file.filename.endswith('.docx'):
+        return {
+            'filename': file.filename,
+            'status': 'failed',
+            'error': 'Invalid file type'
+        }
+    
+    try:
+        # Process each file
+        response = await convert_upload(file)
+        return {
+            'filename': file.filename,
+            'status': response.status,
+            'confidence_score': response.confidence_score,
+            'conversion_id': response.conversion_id
+        }
+    except Exception as e:
+        return {
+            'filename': file.filename,
+            'status': 'failed',
+            'error': str(e)
+        }
+
 @app.post("/api/v1/convert/batch")
 async def convert_batch(
     files: List[UploadFile] = File(..., description="Multiple DOCX files to convert")
@@ -290,41 +674,107 @@ async def convert_batch(
     Returns a report with all conversion results
     """
     batch_id = str(uuid.uuid4())
-    results = []
-    
-    for file in files:
-        if not file.filename.endswith('.docx'):
-            results.append({
-                'filename': file.filename,
-                'status': 'failed',
-                'error': 'Invalid file type'
-            })
-            continue
-        
-        try:
-            # Process each file
-            response = await convert_docx(BackgroundTasks(), file)
-            results.append({
-                'filename': file.filename,
-                'status': response.status,
-                'confidence_score': response.confidence_score,
-                'conversion_id': response.conversion_id
-            })
-        except Exception as e:
-            results.append({
-                'filename': file.filename,
-                'status': 'failed',
-                'error': str(e)
-            })
+    
+    # Files convert concurrently, up to MAX_CONCURRENCY at a time
+    results = await asyncio.gather(*(convert_batch_file(file) for file in files))
+    statuses = Counter(r['status'] for r in results)
     
     return {
         'batch_id': batch_id,
         'total_files': len(files),
-        'successful': len([r for r in results if r['status'] == 'success']),
-        'failed': len([r for r in results if r['status'] == 'failed']),
+        'successful': statuses['success'],
+        'failed': statuses['failed'],
         'results': results
     }
 
+# conversion_id -> state of conversions accepted by /api/v1/convert/async,
+# oldest first; beyond the cap the oldest finished job makes room
+conversion_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+MAX_CONVERSION_JOBS = 100
+# Job states before a conversion has an outcome
+ACTIVE_JOB_STATUSES = ('queued', 'processing')
+# Running job tasks, referenced so they aren't garbage collected mid-run
+_job_tasks = set()
+
+def make_room_for_job() -> bool:
+    """Evict the oldest finished job if the job table is full; False if all are in flight"""
+    if len(conversion_jobs) < MAX_CONVERSION_JOBS:
+        return True
+    for conversion_id, job in conversion_jobs.items():
+        if job['status'] not in ACTIVE_JOB_STATUSES:
+            del conversion_jobs[conversion_id]
+            return True
+    return False
+
+async def run_conversion_job(job: Dict[str, Any], data: bytes, digest: str, start_time: float):
+    """Convert a queued upload, recording the outcome on its job"""
+    job['status'] = 'processing'
+    try:
+        result = await convert_document(job['conversion_id'], job['filename'], data, digest, start_time)
+        job['status'] = result.status
+        job['result'] = result
+    except HTTPException as e:
+        job['status'] = 'failed'
+        job['error'] = e.detail
+
+@app.post("/api/v1/convert/async", status_code=202)
+async def convert_docx_async(
+    file: UploadFile = File(..., description="DOCX file to convert")
+):
+    """
+    Queue a DOCX file for conversion and return immediately
+    
+    - **file**: DOCX file to convert (required)
+    
+    Returns the conversion_id to poll at /api/v1/convert/jobs/{conversion_id},
+    or 503 while MAX_CONVERSION_JOBS conversions are still in flight
+    """
+    start_time = time.time()
+    conversion_id = str(uuid.uuid4())
+    
+    # Refuse before reading the upload. Jobs still in flight are never
+    # evicted: their clients are polling them
+    if not make_room_for_job():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many conversions in progress, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    # The slot is held while the upload is read, so concurrent requests
+    # can't overfill the table
+    job = {'conversion_id': conversion_id, 'filename': file.filename, 'status': 'queued'}
+    conversion_jobs[conversion_id] = job
+    try:
+        data, digest = await read_upload(file)
+    except BaseException:
+        conversion_jobs.pop(conversion_id, None)
+        raise
+    
+    task = asyncio.create_task(run_conversion_job(job, data, digest, start_time))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    
+    return {'conversion_id': conversion_id, 'status': 'queued'}
+
+@app.get("/api/v1/convert/jobs/{conversion_id}")
+async def get_conversion_job(conversion_id: str):
+    """
+    Get the state of a queued conversion
+    
+    - **conversion_id**: UUID returned by /api/v1/convert/async
+    
+    Returns the job status, with the full conversion result once finished
+    """
+    job = conversion_jobs.get(conversion_id)
+    if job is not None:
+        return job
+    
+    raise HTTPException(
+        status_code=404,
+        detail=f"Conversion job {conversion_id} not found"
+    )
+
 @app.get("/api/v1/report/{conversion_id}")
 async def get_conversion_report(conversion_id: str):
     """
@@ -334,10 +784,9 @@ async def get_conversion_report(conversion_id: str):
     
     Returns detailed conversion report if available
     """
-    # Find conversion in history
-    for conversion in metrics_store.conversion_history:
-        if conversion.get('conversion_id') == conversion_id:
-            return conversion
+    conversion = await metrics_store.get_conversion(conversion_id)
+    if conversion is not None:
+        return conversion
     
     raise HTTPException(
         status_code=404,
@@ -345,7 +794,7 @@ async def get_conversion_report(conversion_id: str):
     )
 
 @app.get("/api/v1/sample")
-async def download_sample():
+async def download_sample(request: Request):
     """
     Download a sample DOCX file for testing
     
@@ -353,10 +802,17 @@ async def download_sample():
     """
     sample_file = Path("SUPLC1031.docx")
     if sample_file.exists():
+        # Only changes on deploy, so let browsers and proxies revalidate
+        stat = sample_file.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        headers = {"Cache-Control": "public, max-age=86400", "ETag": etag}
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
         return FileResponse(
             path=sample_file,
             media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            filename="sample_sharedo_template.docx"
+            filename="sample_sharedo_template.docx",
+            headers=headers
         )
     else:
         raise HTTPException(
@@ -366,4 +822,13 @@ async def download_sample():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Metrics and reports (without METRICS_DB) and the in-memory cache are
+    # per process, so run a single worker unless WEB_CONCURRENCY asks for
+    # more; DEV=1 reloads
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("APP_HOST", "0.0.0.0"),
+        port=int(os.getenv("APP_PORT", 8000)),
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        reload=os.getenv("DEV") == "1"
+    )
\ No newline at end of file
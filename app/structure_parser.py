@@ -11,14 +11,54 @@ World-class implementation with state management and validation.
 """
 
 import re
+import sys
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from enum import Enum
-from bs4 import BeautifulSoup, Tag
+from functools import lru_cache
+from bs4 import BeautifulSoup, NavigableString, Tag
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Structure visualization CSS added to the head of parsed documents
+_STRUCTURE_CSS = """
+        [data-nesting-level] { position: relative; }
+        [data-nesting-level="1"] { border-left: 2px solid #e0e0e0; }
+        [data-nesting-level="2"] { border-left: 2px solid #d0d0d0; }
+        [data-nesting-level="3"] { border-left: 2px solid #c0c0c0; }
+        [data-conditional] { background-color: rgba(255, 243, 205, 0.1); }
+        [data-nested-conditional] { background-color: rgba(255, 243, 205, 0.2); }
+        [data-complex-content] { background-color: rgba(230, 247, 255, 0.1); }
+        """
+
+# Characters that re.IGNORECASE matches to a keyword letter but str.lower()
+# doesn't fold to it ('İ' would also lengthen the string)
+_KEYWORD_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+
+
+def _fold_keywords(text: str) -> str:
+    """Lower-case text for keyword search the way re.IGNORECASE would"""
+    if 'İ' in text or 'ı' in text or 'ſ' in text:
+        text = text.translate(_KEYWORD_FOLD)
+    return text.lower()
+
+
+# Presentational attributes carried over into a node's formatting
+_FORMAT_ATTRS = ('align', 'valign', 'width', 'height', 'bgcolor', 'border')
+
+
+@lru_cache(maxsize=4096)
+def _parse_inline_style(style_str: str) -> Tuple[Tuple[str, str], ...]:
+    """Split a style attribute into (property, value) pairs"""
+    # DOCX output repeats the same few style strings on every cell
+    pairs = []
+    for style in style_str.split(';'):
+        prop, sep, value = style.partition(':')
+        if sep:
+            pairs.append((prop.strip(), value.strip()))
+    return tuple(pairs)
+
 
 class StructureType(Enum):
     """Types of document structures"""
@@ -38,7 +78,11 @@ class ConditionalType(Enum):
     NESTED = "nested"
 
 
-@dataclass
+# Slotted dataclasses need Python 3.10; older interpreters get plain ones
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class StructureNode:
     """Represents a node in the document structure tree"""
     type: StructureType
@@ -48,6 +92,23 @@ class StructureNode:
     attributes: Dict[str, Any] = field(default_factory=dict)
     formatting: Dict[str, str] = field(default_factory=dict)
     conditional_info: Optional[Dict] = None
+    # Depth of the deepest leaf under this node (its own depth while it is a
+    # leaf); kept current as the parser attaches children bottom-up
+    max_subtree_depth: int = field(default=-1, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.max_subtree_depth < 0:
+            self.max_subtree_depth = max(
+                (child.max_subtree_depth for child in self.children), default=self.depth
+            )
+    
+    def add_child(self, child: 'StructureNode'):
+        """Append a fully built child, updating max_subtree_depth"""
+        if self.children:
+            self.max_subtree_depth = max(self.max_subtree_depth, child.max_subtree_depth)
+        else:
+            self.max_subtree_depth = child.max_subtree_depth
+        self.children.append(child)
 
 
 class AdvancedStructureParser:
@@ -72,6 +133,15 @@ class AdvancedStructureParser:
         'for_loop': re.compile(r'\{\%\s*for\s+(.+?)\s+in\s+(.+?)\s*\%\}', re.IGNORECASE)
     }
     
+    # The patterns in dict order, for the per-line scan in _parse_text_structure
+    _COND_PATTERN_LIST = tuple(CONDITIONAL_PATTERNS.values())
+    
+    # Every conditional pattern needs one of these words (in any case), so
+    # lines without them are ruled out before any of the patterns above run
+    CONDITIONAL_KEYWORDS = ('if', 'else', 'switch', 'case', 'for')
+    # Likewise for the if/else/endif markers wrapped in HTML text nodes
+    BRANCH_KEYWORDS = ('if', 'else')
+    
     def __init__(self):
         """Initialize the advanced structure parser"""
         self.structure_stack = []
@@ -113,7 +183,7 @@ class AdvancedStructureParser:
             enhanced_html = self._parse_text_structure(content, root)
         
         # Update statistics
-        self.statistics['max_depth_reached'] = self._calculate_max_depth(root)
+        self.statistics['max_depth_reached'] = root.max_subtree_depth
         
         return root, enhanced_html
     
@@ -134,10 +204,10 @@ class AdvancedStructureParser:
         self._process_nested_tables(soup, parent)
         
         # Process conditional blocks
-        self._process_conditional_blocks(soup, parent)
+        conditional_divs = self._process_conditional_blocks(soup, parent)
         
         # Process mixed content
-        self._process_mixed_content(soup, parent)
+        self._process_mixed_content(soup, parent, conditional_divs)
         
         # Add structure metadata to HTML
         enhanced_html = self._add_structure_metadata(soup)
@@ -174,15 +244,24 @@ class AdvancedStructureParser:
             # Extract formatting
             table_node.formatting = self._extract_formatting(table)
             
+            # One walk over the table gathers its cells (nested tables'
+            # included) and whether any table is nested inside it
+            cells = []
+            nested_tables = False
+            for elem in table.descendants:
+                name = elem.name
+                if name == 'td' or name == 'th':
+                    cells.append(elem)
+                elif name == 'table':
+                    nested_tables = True
+            
             # Check for nested tables
-            nested_tables = table.find_all('table')
             if nested_tables:
                 self.statistics['nested_structures'] += 1
                 
                 # Process each cell for nested structures
-                for cell in table.find_all(['td', 'th']):
-                    cell_tables = cell.find_all('table', recursive=False)
-                    if cell_tables:
+                for cell in cells:
+                    if cell.find('table', recursive=False):
                         self._process_nested_tables(cell, table_node, depth + 1)
             
             # Add enhanced attributes for preservation
@@ -190,28 +269,50 @@ class AdvancedStructureParser:
             table['data-structure-type'] = 'nested-table' if nested_tables else 'simple-table'
             
             # Preserve complex cell content
-            for cell in table.find_all(['td', 'th']):
+            for cell in cells:
                 self._preserve_cell_content(cell, depth + 1)
             
-            parent.children.append(table_node)
+            parent.add_child(table_node)
     
-    def _process_conditional_blocks(self, soup: BeautifulSoup, parent: StructureNode):
+    def _process_conditional_blocks(self, soup: BeautifulSoup,
+                                    parent: StructureNode) -> List[Tag]:
         """
         Process and enhance conditional blocks.
         
         Args:
             soup: BeautifulSoup object
             parent: Parent structure node
+            
+        Returns:
+            The <div data-conditional="if"> elements in document order,
+            including the wrappers added here
         """
-        # Find text nodes that might contain conditionals
-        text_nodes = soup.find_all(string=True)
+        # One walk collects the text nodes that might contain conditionals
+        # along with any elements already marked as conditional
+        nodes = [
+            node for node in soup.descendants
+            if isinstance(node, NavigableString) or node.get('data-conditional') is not None
+        ]
         
         conditional_stack = []
         current_conditional = None
-        
-        for text_node in text_nodes:
+        # Every data-conditional element, and just the if divs among them
+        conditional_elems = []
+        conditional_divs = []
+        
+        for text_node in nodes:
+            if not isinstance(text_node, NavigableString):
+                conditional_elems.append(text_node)
+                if text_node.name == 'div' and text_node.get('data-conditional') == 'if':
+                    conditional_divs.append(text_node)
+                continue
+            
             text = str(text_node)
             
+            folded = _fold_keywords(text)
+            if not any(word in folded for word in self.BRANCH_KEYWORDS):
+                continue
+            
             # Check for IF statements
             if_match = (
                 self.CONDITIONAL_PATTERNS['if_simple'].search(text) or
@@ -247,6 +348,8 @@ class AdvancedStructureParser:
                 
                 if text_node.parent:
                     text_node.wrap(wrapper)
+                    conditional_elems.append(wrapper)
+                    conditional_divs.append(wrapper)
             
             # Check for ELSE statements
             elif self.CONDITIONAL_PATTERNS['else'].search(text):
@@ -262,12 +365,13 @@ class AdvancedStructureParser:
                     
                     if text_node.parent:
                         text_node.wrap(wrapper)
+                        conditional_elems.append(wrapper)
             
             # Check for ENDIF statements
             elif self.CONDITIONAL_PATTERNS['endif'].search(text):
                 if conditional_stack:
                     completed_conditional = conditional_stack.pop()
-                    parent.children.append(completed_conditional)
+                    parent.add_child(completed_conditional)
                     
                     # Mark end of conditional
                     wrapper = soup.new_tag('div', **{
@@ -277,6 +381,7 @@ class AdvancedStructureParser:
                     
                     if text_node.parent:
                         text_node.wrap(wrapper)
+                        conditional_elems.append(wrapper)
                     
                     current_conditional = conditional_stack[-1] if conditional_stack else None
         
@@ -285,22 +390,25 @@ class AdvancedStructureParser:
             self.statistics['complex_structures'] += 1
             
             # Mark as nested conditional structure
-            for elem in soup.find_all(attrs={'data-conditional': True}):
+            for elem in conditional_elems:
                 depth = int(elem.get('data-depth', 0))
                 if depth > 1:
                     elem['data-nested-conditional'] = 'true'
+        
+        return conditional_divs
     
-    def _process_mixed_content(self, soup: BeautifulSoup, parent: StructureNode):
+    def _process_mixed_content(self, soup: BeautifulSoup, parent: StructureNode,
+                               conditional_divs: List[Tag]):
         """
         Process mixed content types (tables within conditionals, etc.).
         
         Args:
             soup: BeautifulSoup object
             parent: Parent structure node
+            conditional_divs: <div data-conditional="if"> elements in
+                document order, from _process_conditional_blocks
         """
         # Find conditional blocks containing tables
-        conditional_divs = soup.find_all('div', attrs={'data-conditional': 'if'})
-        
         for cond_div in conditional_divs:
             tables_in_conditional = cond_div.find_all('table')
             
@@ -326,7 +434,7 @@ class AdvancedStructureParser:
                     table['data-within-conditional'] = 'true'
                     table['data-conditional-depth'] = cond_div.get('data-depth', '1')
                 
-                parent.children.append(mixed_node)
+                parent.add_child(mixed_node)
     
     def _preserve_cell_content(self, cell: Tag, depth: int):
         """
@@ -336,19 +444,26 @@ class AdvancedStructureParser:
             cell: Table cell element
             depth: Current nesting depth
         """
-        # Check for complex content
-        has_list = cell.find(['ul', 'ol'])
-        has_table = cell.find('table')
-        has_multiple_paragraphs = len(cell.find_all('p')) > 1
-        
-        if has_list or has_table or has_multiple_paragraphs:
+        # Check for complex content, in one walk over the cell
+        lists = []
+        has_table = False
+        paragraphs = 0
+        for elem in cell.descendants:
+            name = elem.name
+            if name == 'ul' or name == 'ol':
+                lists.append(elem)
+            elif name == 'table':
+                has_table = True
+            elif name == 'p':
+                paragraphs += 1
+        
+        if lists or has_table or paragraphs > 1:
             cell['data-complex-content'] = 'true'
             cell['data-content-depth'] = str(depth)
             
             # Preserve formatting
-            if has_list:
-                for list_elem in cell.find_all(['ul', 'ol']):
-                    list_elem['data-preserved-list'] = 'true'
+            for list_elem in lists:
+                list_elem['data-preserved-list'] = 'true'
                     
             if has_table:
                 cell['data-has-nested-table'] = 'true'
@@ -363,25 +478,16 @@ class AdvancedStructureParser:
         Returns:
             Dictionary of formatting properties
         """
-        formatting = {}
-        
         # Extract inline styles
-        if element.get('style'):
-            style_str = element['style']
-            styles = [s.strip() for s in style_str.split(';') if s.strip()]
-            
-            for style in styles:
-                if ':' in style:
-                    prop, value = style.split(':', 1)
-                    formatting[prop.strip()] = value.strip()
+        style_str = element.get('style')
+        formatting = dict(_parse_inline_style(style_str)) if style_str else {}
         
         # Extract classes
         if element.get('class'):
             formatting['classes'] = ' '.join(element['class'])
         
         # Extract specific formatting attributes
-        format_attrs = ['align', 'valign', 'width', 'height', 'bgcolor', 'border']
-        for attr in format_attrs:
+        for attr in _FORMAT_ATTRS:
             if element.get(attr):
                 formatting[attr] = element[attr]
         
@@ -405,18 +511,9 @@ class AdvancedStructureParser:
             soup.body['data-conditional-count'] = str(self.statistics['conditionals_parsed'])
         
         # Add CSS for structure visualization (optional)
-        style_tag = soup.new_tag('style')
-        style_tag.string = """
-        [data-nesting-level] { position: relative; }
-        [data-nesting-level="1"] { border-left: 2px solid #e0e0e0; }
-        [data-nesting-level="2"] { border-left: 2px solid #d0d0d0; }
-        [data-nesting-level="3"] { border-left: 2px solid #c0c0c0; }
-        [data-conditional] { background-color: rgba(255, 243, 205, 0.1); }
-        [data-nested-conditional] { background-color: rgba(255, 243, 205, 0.2); }
-        [data-complex-content] { background-color: rgba(230, 247, 255, 0.1); }
-        """
-        
         if soup.head:
+            style_tag = soup.new_tag('style')
+            style_tag.string = _STRUCTURE_CSS
             soup.head.append(style_tag)
         
         return soup
@@ -432,33 +529,37 @@ class AdvancedStructureParser:
         Returns:
             Enhanced text with structure markers
         """
-        lines = text.split('\n')
-        enhanced_lines = []
-        
-        for line in lines:
+        # A find() pass per keyword over the folded text collects the lines
+        # holding one; only those are checked against the full patterns, and
+        # a marker comment is spliced in ahead of each match
+        folded = _fold_keywords(text)
+        line_starts = set()
+        for word in self.CONDITIONAL_KEYWORDS:
+            position = folded.find(word)
+            while position >= 0:
+                line_starts.add(folded.rfind('\n', 0, position) + 1)
+                line_end = folded.find('\n', position)
+                if line_end < 0:
+                    break
+                position = folded.find(word, line_end + 1)
+        
+        patterns = self._COND_PATTERN_LIST
+        enhanced_parts = []
+        copied_to = 0
+        
+        for line_start in sorted(line_starts):
+            line_end = text.find('\n', line_start)
+            line = text[line_start:line_end] if line_end >= 0 else text[line_start:]
+            
             # Check for conditional patterns
-            if any(pattern.search(line) for pattern in self.CONDITIONAL_PATTERNS.values()):
+            if any(pattern.search(line) for pattern in patterns):
                 self.statistics['conditionals_parsed'] += 1
-                enhanced_lines.append(f'<!-- CONDITIONAL: {line.strip()} -->\n{line}')
-            else:
-                enhanced_lines.append(line)
+                enhanced_parts.append(text[copied_to:line_start])
+                enhanced_parts.append(f'<!-- CONDITIONAL: {line.strip()} -->\n')
+                copied_to = line_start
         
-        return '\n'.join(enhanced_lines)
-    
-    def _calculate_max_depth(self, node: StructureNode) -> int:
-        """
-        Calculate maximum depth in structure tree.
-        
-        Args:
-            node: Root node
-            
-        Returns:
-            Maximum depth
-        """
-        if not node.children:
-            return node.depth
-        
-        return max(self._calculate_max_depth(child) for child in node.children)
+        enhanced_parts.append(text[copied_to:])
+        return ''.join(enhanced_parts)
     
     def validate_structure(self, root: StructureNode) -> Dict[str, Any]:
         """
@@ -477,15 +578,17 @@ class AdvancedStructureParser:
             'structure_summary': {}
         }
         
+        tree = self._walk_once(root)
+        
         # Check maximum depth
-        max_depth = self._calculate_max_depth(root)
+        max_depth = tree['max_depth']
         if max_depth > self.MAX_NESTING_DEPTH:
             validation_results['warnings'].append(
                 f"Structure depth {max_depth} exceeds recommended maximum {self.MAX_NESTING_DEPTH}"
             )
         
         # Check for unclosed conditionals
-        open_conditionals = self._find_unclosed_conditionals(root)
+        open_conditionals = tree['unclosed']
         if open_conditionals:
             validation_results['is_valid'] = False
             validation_results['errors'].append(
@@ -493,59 +596,77 @@ class AdvancedStructureParser:
             )
         
         # Check for invalid nesting
-        invalid_nesting = self._find_invalid_nesting(root)
+        invalid_nesting = tree['invalid']
         if invalid_nesting:
             validation_results['warnings'].extend(invalid_nesting)
         
         # Generate structure summary
+        by_type = tree['by_type']
         validation_results['structure_summary'] = {
-            'total_nodes': self._count_nodes(root),
+            'total_nodes': tree['total'],
             'max_depth': max_depth,
-            'table_nodes': self._count_by_type(root, StructureType.TABLE),
-            'conditional_nodes': self._count_by_type(root, StructureType.CONDITIONAL),
-            'mixed_nodes': self._count_by_type(root, StructureType.MIXED)
+            'table_nodes': by_type[StructureType.TABLE],
+            'conditional_nodes': by_type[StructureType.CONDITIONAL],
+            'mixed_nodes': by_type[StructureType.MIXED]
         }
         
         return validation_results
     
-    def _find_unclosed_conditionals(self, node: StructureNode) -> List[StructureNode]:
-        """Find unclosed conditional blocks."""
-        unclosed = []
-        
-        if node.type == StructureType.CONDITIONAL:
-            if node.conditional_info and not node.conditional_info.get('closed', True):
-                unclosed.append(node)
-        
-        for child in node.children:
-            unclosed.extend(self._find_unclosed_conditionals(child))
-        
-        return unclosed
-    
-    def _find_invalid_nesting(self, node: StructureNode) -> List[str]:
-        """Find invalid nesting patterns."""
-        warnings = []
-        
-        # Check for tables nested too deeply
-        if node.type == StructureType.TABLE and node.depth > 5:
-            warnings.append(f"Table nested {node.depth} levels deep may cause rendering issues")
-        
-        # Check for conditionals in complex structures
-        if node.type == StructureType.MIXED and node.depth > 3:
-            warnings.append(f"Complex mixed structure at depth {node.depth}")
-        
-        for child in node.children:
-            warnings.extend(self._find_invalid_nesting(child))
+    def _walk_once(self, root: StructureNode) -> Dict[str, Any]:
+        """
+        Gather every tree statistic validation needs in one traversal.
         
-        return warnings
-    
-    def _count_nodes(self, node: StructureNode) -> int:
-        """Count total nodes in tree."""
-        return 1 + sum(self._count_nodes(child) for child in node.children)
-    
-    def _count_by_type(self, node: StructureNode, node_type: StructureType) -> int:
-        """Count nodes of specific type."""
-        count = 1 if node.type == node_type else 0
-        return count + sum(self._count_by_type(child, node_type) for child in node.children)
+        Args:
+            root: Root node
+            
+        Returns:
+            Dictionary with max_depth (deepest leaf), total node count,
+            node counts by_type, unclosed conditional nodes and invalid
+            nesting warnings, the last two in document (pre-)order
+        """
+        max_depth = 0
+        total = 0
+        by_type = dict.fromkeys(StructureType, 0)
+        unclosed = []
+        invalid = []
+        
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            node_type = node.type
+            total += 1
+            by_type[node_type] += 1
+            
+            # The checks below are per type, so each node takes one branch
+            # and a warning string is only built when it fires
+            if node_type is StructureType.CONDITIONAL:
+                # Unclosed conditional blocks
+                if node.conditional_info and not node.conditional_info.get('closed', True):
+                    unclosed.append(node)
+            
+            elif node_type is StructureType.TABLE:
+                # Tables nested too deeply
+                if node.depth > 5:
+                    invalid.append(f"Table nested {node.depth} levels deep may cause rendering issues")
+            
+            elif node_type is StructureType.MIXED:
+                # Conditionals in complex structures
+                if node.depth > 3:
+                    invalid.append(f"Complex mixed structure at depth {node.depth}")
+            
+            if node.children:
+                # Reversed so children pop in document order
+                stack.extend(reversed(node.children))
+            elif node.depth > max_depth:
+                max_depth = node.depth
+        
+        return {
+            'max_depth': max_depth if root.children else root.depth,
+            'total': total,
+            'by_type': by_type,
+            'unclosed': unclosed,
+            'invalid': invalid
+        }
     
     def get_statistics(self) -> Dict[str, int]:
         """Get parser statistics."""
@@ -4,6 +4,7 @@ Sharedo Batch DOCX to HTML Converter
 Processes multiple documents with confidence scoring and comprehensive reporting
 """
 
+import io
 import os
 import re
 import json
@@ -94,8 +95,31 @@ class SharedoBatchConverter:
     
     def process_single_document(self, docx_path):
         """Process a single DOCX file with confidence scoring"""
+        file_report, html_content = self._process_document(docx_path, docx_path.name)
+        
+        if html_content is not None:
+            try:
+                # Save HTML
+                output_path = self.output_folder / f"{docx_path.stem}.html"
+                output_path.write_text(html_content, encoding='utf-8')
+                file_report["output_file"] = str(output_path)
+            except Exception as e:
+                self._mark_failed(file_report, e)
+        
+        return file_report
+    
+    def process_bytes(self, name, data):
+        """
+        Process a DOCX held in memory, without touching the filesystem
+        
+        Returns the file report and the generated HTML (None on failure)
+        """
+        return self._process_document(io.BytesIO(data), name)
+    
+    def _process_document(self, source, name):
+        """Analyze, score and convert a DOCX path or binary file object"""
         file_report = {
-            "filename": docx_path.name,
+            "filename": name,
             "status": "pending",
             "confidence_score": 100,
             "issues": [],
@@ -107,7 +131,7 @@ class SharedoBatchConverter:
         
         try:
             # Analyze document first
-            analysis = self.analyze_document(docx_path)
+            analysis = self.analyze_document(source)
             file_report["statistics"] = analysis["statistics"]
             file_report["sharedo_elements"] = analysis["sharedo_elements"]
             
@@ -119,23 +143,22 @@ class SharedoBatchConverter:
             file_report["requires_review"] = confidence < 90 or len(issues) > 0
             
             # Convert document
-            html_content = self.convert_document(docx_path, analysis)
-            
-            # Save HTML
-            output_path = self.output_folder / f"{docx_path.stem}.html"
-            output_path.write_text(html_content, encoding='utf-8')
+            html_content = self.convert_document(source, analysis, title=Path(name).stem)
             
             file_report["status"] = "success"
-            file_report["output_file"] = str(output_path)
+            return file_report, html_content
             
         except Exception as e:
-            file_report["status"] = "failed"
-            file_report["error"] = str(e)
-            file_report["traceback"] = traceback.format_exc()
-            file_report["requires_review"] = True
-            file_report["confidence_score"] = 0
-        
-        return file_report
+            self._mark_failed(file_report, e)
+            return file_report, None
+    
+    def _mark_failed(self, file_report, error):
+        """Record a conversion failure in the file report"""
+        file_report["status"] = "failed"
+        file_report["error"] = str(error)
+        file_report["traceback"] = traceback.format_exc()
+        file_report["requires_review"] = True
+        file_report["confidence_score"] = 0
     
     def analyze_document(self, docx_path):
         """Analyze document for Sharedo elements and complexity"""
@@ -293,13 +316,13 @@ class SharedoBatchConverter:
         
         return confidence, issues, warnings
     
-    def convert_document(self, docx_path, analysis):
+    def convert_document(self, docx_path, analysis, title=None):
         """Convert document to HTML based on analysis"""
         doc = Document(docx_path)
         html_parts = []
         
         # HTML header
-        html_parts.append(self._get_html_header(docx_path.stem))
+        html_parts.append(self._get_html_header(title or docx_path.stem))
         
         # Process content based on whether it's a Sharedo template
         has_sharedo = len(analysis["sharedo_elements"]["content_controls"]) > 0
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+API Behaviour Tests
+===================
+Exercises the service in-process with FastAPI's TestClient:
+1. Single-flight conversion of identical concurrent uploads
+2. Upload rejection (non-ZIP, oversized)
+3. Accept-header negotiation and compression
+4. ETag / If-None-Match revalidation
+5. Async conversion jobs and their eviction
+6. Byte-budgeted LRU eviction and path lookup in the content resolver
+
+Run with: python -m pytest test_api.py (or python test_api.py); TestClient
+needs httpx installed alongside requirements.txt.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parent
+# The app serves templates, static files and the sample relative to the repo
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT))
+
+from app import main
+from app.content_resolver import ContentControlResolver
+
+SAMPLE_DOCX = ROOT / "SUPLC1031.docx"
+
+
+class APITestCase(unittest.TestCase):
+    """Shares one TestClient, and so one event loop, across the API tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+        cls.sample = SAMPLE_DOCX.read_bytes()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def setUp(self):
+        # Every test converts from scratch
+        main.conversion_cache._entries.clear()
+
+    def slow_conversions(self, delay: float = 0.5):
+        """Patch run_conversion to take at least `delay`, counting calls"""
+        calls = []
+        run_conversion = main.run_conversion
+
+        def slow(filename, data):
+            calls.append(filename)
+            time.sleep(delay)
+            return run_conversion(filename, data)
+
+        patcher = mock.patch.object(main, "run_conversion", slow)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    def upload(self, path: str, filename: str, data: bytes, **kwargs):
+        return self.client.post(path, files={"file": (filename, data)}, **kwargs)
+
+    def wait_for_job(self, conversion_id: str, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(f"/api/v1/convert/jobs/{conversion_id}").json()
+            if job["status"] not in main.ACTIVE_JOB_STATUSES:
+                return job
+            time.sleep(0.05)
+        self.fail(f"Job {conversion_id} did not finish within {timeout}s")
+
+
+class TestSingleFlight(APITestCase):
+
+    def test_identical_concurrent_uploads_convert_once(self):
+        calls = self.slow_conversions()
+        # With nothing cached, only joining the running conversion avoids a second one
+        patcher = mock.patch.object(main.conversion_cache, "set", mock.AsyncMock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        responses = [None, None]
+
+        def post(index):
+            responses[index] = self.upload("/api/v1/convert", "single-flight.docx", self.sample)
+
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertEqual(calls, ["single-flight.docx"])
+        first, second = (r.json() for r in responses)
+        self.assertNotEqual(first["conversion_id"], second["conversion_id"])
+        self.assertEqual(first["html_content"], second["html_content"])
+
+
+class TestUploadValidation(APITestCase):
+
+    def test_non_zip_upload_is_rejected(self):
+        response = self.upload("/api/v1/convert", "fake.docx", b"not a zip archive")
+        self.assertEqual(response.status_code, 400)
+
+    def test_wrong_extension_is_rejected(self):
+        response = self.upload("/api/v1/convert", "document.pdf", self.sample)
+        self.assertEqual(response.status_code, 400)
+
+    def test_oversized_upload_is_rejected(self):
+        with mock.patch.object(main, "MAX_UPLOAD_SIZE", len(self.sample) - 1):
+            response = self.upload("/api/v1/convert", "big.docx", self.sample)
+        self.assertEqual(response.status_code, 413)
+
+
+class TestContentNegotiation(APITestCase):
+
+    def test_html_only_when_ranked_above_json(self):
+        for accept, media_type in (
+            ("text/html", "text/html"),
+            ("text/html,application/xhtml+xml,*/*;q=0.8", "text/html"),
+            ("text/html;q=0", "application/json"),
+            ("application/json, text/html;q=0.5", "application/json"),
+            ("*/*", "application/json"),
+        ):
+            with self.subTest(accept=accept):
+                response = self.upload(
+                    "/api/v1/convert", "negotiated.docx", self.sample, headers={"Accept": accept}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.headers["content-type"].split(";")[0], media_type)
+
+    def test_sample_is_not_gzipped(self):
+        response = self.client.get("/api/v1/sample", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.content, self.sample)
+
+
+class TestRevalidation(APITestCase):
+
+    def assert_revalidates(self, path: str):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+
+        for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(path=path, if_none_match=if_none_match):
+                response = self.client.get(path, headers={"If-None-Match": if_none_match})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["etag"], etag)
+
+        response = self.client.get(path, headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_sample_revalidates(self):
+        self.assert_revalidates("/api/v1/sample")
+
+    def test_changelog_revalidates(self):
+        self.assert_revalidates("/changelog")
+
+    def test_metrics_revalidates(self):
+        self.assert_revalidates("/metrics")
+
+
+class TestConversionJobs(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(main.conversion_jobs, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_job_polling(self):
+        response = self.upload("/api/v1/convert/async", "polled.docx", self.sample)
+        self.assertEqual(response.status_code, 202)
+        conversion_id = response.json()["conversion_id"]
+
+        job = self.wait_for_job(conversion_id)
+        self.assertEqual(job["status"], "success")
+        self.assertEqual(job["result"]["conversion_id"], conversion_id)
+        self.assertTrue(job["result"]["html_content"])
+
+    def test_rejected_upload_releases_its_slot(self):
+        response = self.upload("/api/v1/convert/async", "fake.docx", b"not a zip archive")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(main.conversion_jobs, {})
+
+    def test_unknown_job_is_404(self):
+        response = self.client.get("/api/v1/convert/jobs/no-such-job")
+        self.assertEqual(response.status_code, 404)
+
+    def test_jobs_in_flight_are_not_evicted(self):
+        self.slow_conversions()
+        with mock.patch.object(main, "MAX_CONVERSION_JOBS", 1):
+            first = self.upload("/api/v1/convert/async", "first.docx", self.sample)
+            self.assertEqual(first.status_code, 202)
+
+            # The only slot holds a running job, so the next one is refused
+            refused = self.upload("/api/v1/convert/async", "second.docx", self.sample)
+            self.assertEqual(refused.status_code, 503)
+            first_id = first.json()["conversion_id"]
+            self.assertEqual(self.wait_for_job(first_id)["status"], "success")
+
+            # A finished job makes room
+            third = self.upload("/api/v1/convert/async", "third.docx", self.sample)
+            self.assertEqual(third.status_code, 202)
+            response = self.client.get(f"/api/v1/convert/jobs/{first_id}")
+            self.assertEqual(response.status_code, 404)
+
+
+class TestResolverCache(unittest.TestCase):
+
+    def test_eviction_stays_within_budget(self):
+        with tempfile.TemporaryDirectory() as base:
+            for i in range(20):
+                Path(base, f"fragment{i}.html").write_text(f"<p>{'x' * 500} {i}</p>", encoding="utf-8")
+
+            with ContentControlResolver(base_path=base, max_cache_bytes=2000) as resolver:
+                for i in range(20):
+                    resolver.resolve_document("letter.docx", f"{{{{content:fragment{i}.html}}}}")
+                    # Converted DOCX fragments share the same budget
+                    resolver._cache_content(
+                        resolver._fragment_key(Path(base, f"block{i}.docx")), "y" * 300
+                    )
+                    self.assertLessEqual(resolver._cache_bytes, resolver.max_cache_bytes)
+                    self.assertEqual(
+                        resolver._cache_bytes, sum(len(content) for content in resolver.cache.values())
+                    )
+
+                # The most recent entries survive, the oldest were evicted
+                self.assertIn(resolver._generate_cache_key("double_curly", "fragment19.html"), resolver.cache)
+                self.assertNotIn(resolver._generate_cache_key("double_curly", "fragment0.html"), resolver.cache)
+
+    def test_files_added_later_are_found(self):
+        with tempfile.TemporaryDirectory() as base:
+            with ContentControlResolver(base_path=base) as resolver:
+                self.assertIsNone(resolver._resolve_path("late.html"))
+                Path(base, "late.html").write_text("<p>late</p>", encoding="utf-8")
+                self.assertEqual(resolver._resolve_path("late.html"), Path(base, "late.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -536,7 +536,11 @@ def main():
     print()
     
     tester = ImprovementTester(api_url, samples_dir)
-    results = tester.run_tests()
+    try:
+        results = tester.run_tests()
+    finally:
+        # Release the resolver's conversion threads
+        tester.content_resolver.close()
     
     # Save report
     output_path = "improvement_test_results.json"